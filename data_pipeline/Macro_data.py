@@ -4,6 +4,8 @@ import os
 import pandas as pd
 import requests
 
+from data_pipeline import config
+
 # Try to import quandl, fallback gracefully if not available
 try:
     import quandl
@@ -20,7 +22,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Try to get API key from GCP Secret Manager if enabled, otherwise use environment variable
-if os.environ.get("USE_GCP_SECRET_MANAGER", "true") == "true":
+if config.USE_GCP_SECRET_MANAGER:
     try:
         from data_pipeline.utils import get_secret
         DEFAULT_API_KEY = get_secret("QUANDL_API_KEY").strip()
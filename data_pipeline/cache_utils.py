@@ -2,19 +2,31 @@
 
 Requires:
   - config.CACHE_GCS_BUCKET (str)
+  - optional config.CACHE_BACKEND ("gcs" or "memory")
   - optional config.CACHE_GCS_PREFIX (str)
   - optional config.CACHE_EXPIRY_MINUTES (int)
+
+Bulk loads/saves go through the async helpers (``load_many_async`` /
+``save_many_async``), which issue GCS requests concurrently on a single event
+loop.  When ``gcloud-aio-storage`` is installed it is used directly; otherwise
+the blocking client calls are offloaded with ``asyncio.to_thread``.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from threading import Lock
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
-from google.api_core.exceptions import NotFound
-from google.cloud import storage
+try:  # optional native-async GCS client
+    from gcloud.aio.storage import Storage as AioStorage
+    AIO_STORAGE_AVAILABLE = True
+except ImportError:
+    AioStorage = None
+    AIO_STORAGE_AVAILABLE = False
 
 # Updated local imports to use fallback mechanism
 try:
@@ -29,12 +41,37 @@ _CACHE: Dict[str, Dict[str, Any]] = {}
 _CACHE_LOCK = Lock()
 
 # ---------------- Lazy GCS handles ----------------
+# google-cloud-storage is only imported once the "gcs" backend is first used
+storage = None
+NotFound = None
 _client: Optional[storage.Client] = None
 _bucket = None
 
+# Backends selectable via config.CACHE_BACKEND; ``True`` marks the ones
+# persisted to GCS, "memory" keeps entries in-process only.
+_CACHE_BACKENDS = {"gcs": True, "memory": False}
+
+# Upper bound on in-flight GCS requests issued by the async helpers
+ASYNC_CONCURRENCY = 64
+
+
+def _import_storage() -> None:
+    """Import the GCS client library on first use."""
+    global storage, NotFound
+    if storage is None:
+        from google.api_core.exceptions import NotFound as _NotFound
+        from google.cloud import storage as _storage
+
+        storage, NotFound = _storage, _NotFound
+
 
 def _ensure_gcs():
     global _client, _bucket
+    backend = getattr(config, "CACHE_BACKEND", "gcs")
+    if not _CACHE_BACKENDS.get(backend, False):
+        if backend not in _CACHE_BACKENDS:
+            logger.warning("Unknown CACHE_BACKEND '%s'; using in-memory cache only.", backend)
+        return False
     bucket_name = getattr(config, "CACHE_GCS_BUCKET", None)
     logger.debug("Ensuring GCS setup for bucket: %s", bucket_name)
     if not bucket_name:
@@ -43,6 +80,7 @@ def _ensure_gcs():
         return False
     if _client is None:
         logger.debug("Initializing GCS client")
+        _import_storage()
         _client = storage.Client()
     if _bucket is None:
         logger.debug("Accessing GCS bucket '%s'", bucket_name)
@@ -150,22 +188,24 @@ def _persist_entry(ticker: str) -> None:
                        ticker, e, exc_info=True)
 
 
-def load_cached_fundamentals(
-    ticker: str,
-    expiry_minutes: int = getattr(config, "CACHE_EXPIRY_MINUTES", 60),
-) -> Optional[Any]:
-    """Return cached fundamentals for ticker if present and fresh."""
-    logger.debug("Loading cached fundamentals for %s with expiry %d minutes", ticker, expiry_minutes)
-    entry = _load_entry(ticker)
+@lru_cache(maxsize=4096)
+def _parse_timestamp(ts_raw: str) -> datetime:
+    """Parse an entry timestamp once; entries already in memory re-use it."""
+    ts = datetime.fromisoformat(ts_raw)
+    if ts.tzinfo is None:  # legacy records
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def _fresh_data(ticker: str, entry: Optional[Dict[str, Any]],
+                expiry_minutes: int) -> Optional[Any]:
+    """Return ``entry['data']`` if the entry is younger than ``expiry_minutes``."""
     if not entry:
         logger.debug("No cached entry found for %s", ticker)
         return None
 
-    ts_raw = entry.get("timestamp")
     try:
-        ts = datetime.fromisoformat(ts_raw)
-        if ts.tzinfo is None:  # legacy records
-            ts = ts.replace(tzinfo=timezone.utc)
+        ts = _parse_timestamp(entry.get("timestamp"))
     except Exception:
         logger.debug("Invalid timestamp for %s, skipping", ticker)
         return None
@@ -178,6 +218,15 @@ def load_cached_fundamentals(
     return None
 
 
+def load_cached_fundamentals(
+    ticker: str,
+    expiry_minutes: int = getattr(config, "CACHE_EXPIRY_MINUTES", 60),
+) -> Optional[Any]:
+    """Return cached fundamentals for ticker if present and fresh."""
+    logger.debug("Loading cached fundamentals for %s with expiry %d minutes", ticker, expiry_minutes)
+    return _fresh_data(ticker, _load_entry(ticker), expiry_minutes)
+
+
 def save_fundamentals_cache(ticker: str, data: Any) -> None:
     """Store data for ticker and persist it."""
     logger.debug("Saving fundamentals cache for %s", ticker)
@@ -186,6 +235,122 @@ def save_fundamentals_cache(ticker: str, data: Any) -> None:
     _persist_entry(ticker)
 
 
+# ---------------- Async bulk I/O ----------------
+
+
+async def _aload_entry(ticker: str, aio: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+    """Async counterpart of :func:`_load_entry`.
+
+    ``aio`` is an open ``gcloud.aio.storage.Storage`` session; without one the
+    blocking client is driven from a worker thread instead.
+    """
+    with _CACHE_LOCK:
+        if ticker in _CACHE:
+            return _CACHE[ticker]
+
+    if aio is None:
+        return await asyncio.to_thread(_load_entry, ticker)
+
+    try:
+        raw = await aio.download(config.CACHE_GCS_BUCKET, _blob_name(ticker))
+    except Exception as e:
+        if getattr(e, "status", None) == 404:
+            logger.debug("Blob for %s not found in GCS", ticker)
+        else:
+            logger.warning("Async load from GCS failed for %s: %s",
+                           ticker, e, exc_info=True)
+        return None
+
+    try:
+        value = json.loads(raw)
+    except Exception as e:
+        logger.warning("Invalid JSON for %s in GCS: %s",
+                       ticker, e, exc_info=True)
+        return None
+
+    with _CACHE_LOCK:
+        _CACHE[ticker] = value
+    return value
+
+
+async def _apersist_entry(ticker: str, aio: Optional[Any] = None) -> None:
+    """Async counterpart of :func:`_persist_entry`."""
+    with _CACHE_LOCK:
+        entry = _CACHE.get(ticker)
+    if entry is None:
+        logger.debug("No entry in memory for %s, skipping persist", ticker)
+        return
+
+    if aio is None:
+        await asyncio.to_thread(_persist_entry, ticker)
+        return
+
+    payload = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+    try:
+        await aio.upload(config.CACHE_GCS_BUCKET, _blob_name(ticker), payload,
+                         content_type="application/json")
+        logger.debug("Persisted %s to GCS", ticker)
+    except Exception as e:
+        logger.warning("Async persist to GCS failed for %s: %s",
+                       ticker, e, exc_info=True)
+
+
+async def _gather_bounded(fn, tickers: list[str]) -> list:
+    """Run ``fn(ticker, aio)`` for every ticker with at most
+    ``ASYNC_CONCURRENCY`` requests in flight."""
+    semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+
+    async def _run(ticker: str, aio: Optional[Any]):
+        async with semaphore:
+            return await fn(ticker, aio)
+
+    if AIO_STORAGE_AVAILABLE:
+        async with AioStorage() as aio:
+            return await asyncio.gather(*[_run(t, aio) for t in tickers])
+    return await asyncio.gather(*[_run(t, None) for t in tickers])
+
+
+async def load_many_async(tickers: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Load raw cache entries for many tickers concurrently."""
+    tickers = list(dict.fromkeys(tickers))
+    # Resolve the bucket once up front (blocking, but only on first use)
+    if not await asyncio.to_thread(_ensure_gcs):
+        with _CACHE_LOCK:
+            return {t: _CACHE.get(t) for t in tickers}
+    entries = await _gather_bounded(_aload_entry, tickers)
+    return dict(zip(tickers, entries))
+
+
+async def save_many_async(items: Dict[str, Any]) -> None:
+    """Store ``{ticker: data}`` in memory and persist all entries concurrently."""
+    stamp = _now_utc().isoformat()
+    with _CACHE_LOCK:
+        for ticker, data in items.items():
+            _CACHE[ticker] = {"data": data, "timestamp": stamp}
+    if not items or not await asyncio.to_thread(_ensure_gcs):
+        return
+    await _gather_bounded(_apersist_entry, list(items))
+
+
+def load_many_cached_fundamentals(
+    tickers: Iterable[str],
+    expiry_minutes: int = getattr(config, "CACHE_EXPIRY_MINUTES", 60),
+) -> Dict[str, Optional[Any]]:
+    """Return ``{ticker: data or None}`` for fresh cached fundamentals.
+
+    Runs :func:`load_many_async` with ``asyncio.run`` when called from
+    synchronous code; inside a running loop it falls back to sequential loads.
+    """
+    tickers = list(tickers)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        entries = asyncio.run(load_many_async(tickers))
+    else:
+        entries = {t: _load_entry(t) for t in tickers}
+    return {t: _fresh_data(t, entries.get(t), expiry_minutes) for t in tickers}
+
+
 def clear_cached_fundamentals(ticker: str) -> None:
     """Remove ticker from cache and GCS if present."""
     logger.debug("Clearing cached fundamentals for %s", ticker)
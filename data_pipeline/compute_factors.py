@@ -2,132 +2,164 @@ import numpy as np
 import pandas as pd
 import ta
 
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    Parallel = delayed = None
+    JOBLIB_AVAILABLE = False
+
 # Updated local imports to use fallback mechanism
 try:
     from . import config
+    from . import factor_kernels as fk
 except ImportError:
     import data_pipeline.config as config
+    import data_pipeline.factor_kernels as fk
 
 # Config-driven logger
 logger = config.get_file_logger(__name__)
 
 
-def _safe_zscore(x: pd.Series, fill_value: float = 0.0) -> pd.Series:
+def _zscore_by(df: pd.DataFrame, cols, by: str = "Date",
+               fill_value: float = 0.0):
     """
-    Cross-sectional z-score; safe for zero/NaN std.
-    Logs entry, exit, and edge cases.
+    Cross-sectional z-score of ``cols`` (a column name or list of names)
+    within each ``by`` group; groups with a zero/NaN std get ``fill_value``.
+    Uses the built-in mean/std transforms rather than a Python call per
+    group, and a single grouping for all requested columns.
     """
-    logger.debug("_safe_zscore called for series of length %d", len(x))
-    std = x.std()
-    if pd.isna(std) or std == 0:
-        logger.debug(
-            "Standard deviation is zero or NaN; returning fill_value %s", fill_value)
-        return pd.Series(fill_value, index=x.index)
-    result = (x - x.mean()) / std
-    logger.debug("_safe_zscore completed for series of length %d", len(x))
-    return result
+    values = df[cols]
+    g = values.groupby(df[by], sort=False, observed=True)
+    mean = g.transform("mean")
+    std = g.transform("std")
+    z = (values - mean) / std
+    z = z.where(std.notna() & (std != 0), fill_value)
+    # Rows without a group key are left out of the groupby entirely
+    return z.where(df[by].notna(), axis=0)
 
 
-def compute_factors(df: pd.DataFrame) -> pd.DataFrame:
+def _tonum(values):
     """
-    Compute momentum, volatility, moving averages, RSI, MACD, Bollinger Bands,
-    value/quality/liquidity measures, and a composite factor.
+    ``pd.to_numeric(values, errors="coerce")`` that returns input with a
+    float/int dtype untouched instead of re-walking it.
+    """
+    dtype = getattr(values, "dtype", None)
+    if dtype is not None and dtype.kind in "fiu":
+        return values
+    return pd.to_numeric(values, errors="coerce")
 
-    Requires columns:
-      Date, Ticker, close_price, Volume
-    Uses when available:
-      trailingPE, priceToBook, returnOnEquity, profitMargins,
-      marketCap, dividendYield, priceToSalesTrailing12Months
+
+def _safe_reciprocal(values) -> np.ndarray:
     """
+    Element-wise 1/x in a single pass; zero and NaN inputs map to NaN.
+    """
+    x = _tonum(values)
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full_like(x, np.nan)
+    np.divide(1.0, x, out=out, where=x != 0)
+    return out
 
-    logger.info("compute_factors called for DataFrame with %d rows", len(df))
-    try:
-        df = df.sort_values(["Ticker", "Date"]).copy()
-        # Drop duplicate columns to avoid DataFrame assignment errors
-        df = df.loc[:, ~df.columns.duplicated()]
-    except Exception as e:
-        logger.error("Failed to sort DataFrame: %s", e, exc_info=True)
-        raise
-    logger.debug("DataFrame sorted by Ticker and Date")
 
-    # Normalize price column name if provided as 'Close'
-    if "close_price" not in df.columns and "Close" in df.columns:
-        try:
-            df = df.rename(columns={"Close": "close_price"})
-            logger.warning(
-                "Renamed 'Close' to 'close_price' for factor computations")
-        except Exception as e:
-            logger.warning(
-                "Failed to rename 'Close' to 'close_price': %s", e, exc_info=True
-            )
+def _attach_columns(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    """
+    Add ``columns`` (name -> array/Series/scalar) to ``df`` with a single
+    concat instead of one block insertion per column. Names already present
+    are overwritten in place so the existing column order is kept.
+    """
+    new = {}
+    for name, values in columns.items():
+        if name in df.columns:
+            df[name] = values
+        else:
+            new[name] = values
+    if not new:
+        return df
+    return pd.concat([df, pd.DataFrame(new, index=df.index)], axis=1)
+
+
+def _compute_ticker_factors(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the per-ticker time-series factors (momentum, volatility, moving
+    averages, RSI, MACD, Bollinger Bands, volume and Amihud illiquidity).
+
+    ``df`` must hold complete tickers sorted by Ticker and Date; no state is
+    shared across tickers, so any split along ticker boundaries may be
+    processed independently.
+    """
+    # Rows are sorted by (Ticker, Date): work on flat arrays with per-ticker
+    # block boundaries instead of a groupby lambda per indicator.
+    work_dtype = np.dtype(getattr(config, "FACTOR_DTYPE", "float64"))
+    close = _tonum(df["close_price"]).to_numpy(dtype=work_dtype)
+    # Integer ticker codes: boundaries and grouping scan ints, not strings
+    ticker_codes = pd.factorize(df["Ticker"], sort=False)[0].astype(np.int32)
+    starts = fk.group_starts(ticker_codes)
+    positions = fk.group_positions(starts)
+    # Single grouper for the indicators that still go through pandas/ta
+    by_ticker = df["close_price"].groupby(ticker_codes, sort=False, group_keys=False)
+    # New columns are collected here and attached in one step at the end
+    factors = {}
+    # pct_change pads interior gaps before differencing
+    close_ff = fk.grouped_ffill(close, starts)
 
     # ---------- Momentum ----------
     logger.debug("Starting momentum calculations")
+    # All horizons come from one log-price array; non-positive prices (bad
+    # ticks) fall back to plain ratios so they keep pct_change semantics.
+    with np.errstate(invalid="ignore"):
+        log_ok = not np.any(close_ff <= 0)
+    log_close = np.log(close_ff) if log_ok else None
+    returns = {}
     for period, label in zip([21, 63, 126, 252], ["1m", "3m", "6m", "12m"]):
         try:
-            returns_series = (
-                df.groupby("Ticker")["close_price"]
-                .transform(lambda s: s.pct_change(periods=period).fillna(0.0).squeeze())
-            )
-            df[f"return_{label}"] = returns_series
+            if log_close is not None:
+                ret = np.expm1(fk.grouped_lag_diff(log_close, starts, period, positions))
+            else:
+                ret = fk.grouped_pct_change(close_ff, starts, period, positions)
+            returns[period] = np.where(np.isnan(ret), 0.0, ret)
+            factors[f"return_{label}"] = returns[period]
         except Exception as e:
             logger.warning(
                 f"Failed to compute return_{label}: %s", e, exc_info=True)
     # 12-1 momentum
     try:
-        mom_252 = (
-            df.groupby("Ticker")["close_price"]
-            .transform(lambda s: s.pct_change(periods=252).fillna(0.0).squeeze())
-        )
-        mom_21 = (
-            df.groupby("Ticker")["close_price"]
-            .transform(lambda s: s.pct_change(periods=21).fillna(0.0).squeeze())
-        )
-        df["momentum_12_1"] = mom_252 - mom_21
+        factors["momentum_12_1"] = returns[252] - returns[21]
     except Exception as e:
         logger.warning("Failed to compute momentum_12_1: %s", e, exc_info=True)
 
     # ---------- Volatility ----------
     logger.debug("Starting volatility calculations")
+    daily_ret = fk.grouped_pct_change(close_ff, starts, 1, positions)
     for window in [21, 63, 252]:
         try:
-            vol_series=(
-                df.groupby("Ticker")["close_price"]
-                .transform(
-                    lambda s: s.pct_change()
-                    .rolling(window, min_periods=max(2, window // 3))
-                    .std()
-                )
-                .fillna(0.0)
-            )
-            df[f"vol_{window}d"]=vol_series
+            vol = fk.rolling_std_grouped(
+                daily_ret, starts, window, max(2, window // 3))
+            factors[f"vol_{window}d"] = np.where(np.isnan(vol), 0.0, vol)
         except Exception as e:
             logger.warning(
                 f"Failed to compute vol_{window}d: %s", e, exc_info=True)
 
     # ---------- Moving Averages ----------
     logger.debug("Starting moving averages calculations")
-    for window in [20, 50, 200]:
-        try:
-            ma_series=(
-                df.groupby("Ticker")["close_price"]
-                .transform(lambda s: ta.trend.sma_indicator(s, window=window))
-                .fillna(0.0)
-            )
-            df[f"ma_{window}"]=ma_series
-        except Exception as e:
-            logger.warning(
-                f"Failed to compute ma_{window}: %s", e, exc_info=True)
+    try:
+        sma = fk.grouped_sma(close, starts, [20, 50, 200], positions)
+        for window, ma in sma.items():
+            factors[f"ma_{window}"] = np.where(np.isnan(ma), 0.0, ma)
+    except Exception as e:
+        logger.warning("Failed to compute moving averages: %s", e, exc_info=True)
 
     # ---------- RSI ----------
     logger.debug("Starting RSI calculation")
     try:
-        rsi_series=(
-            df.groupby("Ticker")["close_price"]
-            .transform(lambda s: ta.momentum.rsi(s, window=14))
-            .fillna(0.0)
-        )
-        df["RSI_14"]=rsi_series
+        if fk.NUMBA_AVAILABLE:
+            rsi = fk.rsi_grouped(close, starts, 14)
+            factors["RSI_14"] = np.where(np.isnan(rsi), 0.0, rsi)
+        else:
+            factors["RSI_14"] = (
+                by_ticker
+                .transform(lambda s: ta.momentum.rsi(s, window=14))
+                .fillna(0.0)
+            )
     except Exception as e:
         logger.warning("Failed to compute RSI_14: %s", e, exc_info=True)
 
@@ -137,9 +169,8 @@ def compute_factors(df: pd.DataFrame) -> pd.DataFrame:
     def _macd(series: pd.Series) -> pd.DataFrame:
         """
         Compute MACD and MACD histogram for a price series.
-        Logs entry and errors.
+        Logs errors.
         """
-        logger.debug("_macd called for series of length %d", len(series))
         try:
             series=series.dropna()
             if len(series) < 26:
@@ -152,69 +183,154 @@ def compute_factors(df: pd.DataFrame) -> pd.DataFrame:
             return pd.DataFrame({"MACD": np.nan, "MACDh": np.nan}, index=series.index)
 
     try:
-        macd_df=df.groupby("Ticker", group_keys=False)["close_price"].apply(
-            lambda x: _macd(x)).reset_index(level=0, drop=True)
-        df[["MACD", "MACDh"]]=macd_df
+        if fk.NUMBA_AVAILABLE:
+            factors["MACD"], factors["MACDh"] = fk.macd_grouped(close, starts)
+        else:
+            macd_df=by_ticker.apply(lambda x: _macd(x))
+            factors["MACD"], factors["MACDh"] = macd_df["MACD"], macd_df["MACDh"]
     except Exception as e:
         logger.warning("Failed to compute MACD/MACDh: %s", e, exc_info=True)
 
     # ---------- Bollinger Bands ----------
     logger.debug("Starting Bollinger Bands calculation")
+    try:
+        # 20-observation window over the ticker's non-missing closes
+        prices, price_starts, has_price = fk.compact(close, starts)
+        mid, std = fk.rolling_mean_std_grouped(prices, price_starts, 20, 20, ddof=0)
+        factors["BBU_20"] = fk.expand(mid + 2.0 * std, has_price)
+        factors["BBL_20"] = fk.expand(mid - 2.0 * std, has_price)
+    except Exception as e:
+        logger.warning("Failed to compute Bollinger Bands: %s",
+                       e, exc_info=True)
 
-    def _bb(series: pd.Series) -> pd.DataFrame:
-        """
-        Compute Bollinger Bands for a price series.
-        Logs entry and errors.
-        """
-        logger.debug("_bb called for series of length %d", len(series))
-        try:
-            series=series.dropna()
-            if len(series) < 20:
-                return pd.DataFrame({"BBU_20": np.nan, "BBL_20": np.nan}, index=series.index)
-            bb=ta.volatility.BollingerBands(series, window=20, window_dev=2)
-            return pd.DataFrame(
-                {"BBU_20": bb.bollinger_hband(), "BBL_20": bb.bollinger_lband()},
-                index=series.index,
-            )
-        except Exception as e:
-            logger.warning(
-                "Bollinger Bands calculation failed: %s", e, exc_info=True)
-            return pd.DataFrame({"BBU_20": np.nan, "BBL_20": np.nan}, index=series.index)
+    volume = None
+    if "Volume" not in df.columns:
+        logger.warning("Column 'Volume' missing; avg_volume_21d set to NaN.")
+        factors["avg_volume_21d"] = np.nan
+    else:
+        volume = _tonum(df["Volume"]).to_numpy(dtype=work_dtype)
+        avg_volume = fk.rolling_mean_grouped(volume, starts, 21, 5)
+        factors["avg_volume_21d"] = np.where(np.isnan(avg_volume), 0.0, avg_volume)
 
+    # ---------- Amihud illiquidity ----------
+    logger.debug("Starting Amihud illiquidity calculation")
     try:
-        bb_df=df.groupby("Ticker", group_keys=False)["close_price"].apply(
-            lambda x: _bb(x)).reset_index(level=0, drop=True)
-        df[["BBU_20", "BBL_20"]]=bb_df
+        if volume is None:
+            raise KeyError("Volume")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Turnover can exceed float32 precision; form it in float64
+            traded_amount = np.where(volume == 0, np.nan, volume).astype(np.float64) * close
+            raw_impact = np.abs(daily_ret) / traded_amount
+        amihud = fk.rolling_mean_grouped(raw_impact, starts, 21, 5)
+        # Ensure zero-volume rows yield NaN as per expected behavior
+        amihud[volume == 0] = np.nan
+        factors["amihud_illiquidity"] = amihud
     except Exception as e:
-        logger.warning("Failed to compute Bollinger Bands: %s",
+        logger.warning(
+            "Failed to compute amihud_illiquidity: %s", e, exc_info=True)
+
+    return _attach_columns(df, factors)
+
+
+def _ticker_batches(df: pd.DataFrame, n_batches: int) -> list:
+    """Split a Ticker-sorted frame into at most ``n_batches`` contiguous
+    slices that never cut through a ticker."""
+    starts = fk.group_starts(pd.factorize(df["Ticker"], sort=False)[0])[:-1]
+    bounds = [chunk[0] for chunk in np.array_split(starts, n_batches) if len(chunk)]
+    bounds.append(len(df))
+    return [df.iloc[a:b].copy() for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _run_ticker_factors(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Run :func:`_compute_ticker_factors`, fanning out over ticker batches with
+    joblib when it is installed and the frame is large enough to benefit.
+
+    With numba available the kernels already run multi-threaded without the
+    GIL, so worker processes would only add pickling cost; the pool is used
+    for the pure-Python (ta/pandas) fallbacks.
+    """
+    n_jobs = getattr(config, "FACTOR_N_JOBS", 1)
+    min_rows = getattr(config, "FACTOR_PARALLEL_MIN_ROWS", 200_000)
+    if (not JOBLIB_AVAILABLE or fk.NUMBA_AVAILABLE or n_jobs == 1
+            or len(df) < min_rows):
+        return _compute_ticker_factors(df)
+
+    workers = config.available_cpus() if n_jobs < 0 else n_jobs
+    batches = _ticker_batches(df, workers * 4)
+    if len(batches) < 2:
+        return _compute_ticker_factors(df)
+    logger.info("Computing ticker factors in %d batches on %d workers",
+                len(batches), workers)
+    try:
+        results = Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(_compute_ticker_factors)(batch) for batch in batches)
+    except Exception as e:
+        logger.warning("Parallel factor computation failed, running serially: %s",
                        e, exc_info=True)
+        return _compute_ticker_factors(df)
+    return pd.concat(results)
+
+
+def compute_factors(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute momentum, volatility, moving averages, RSI, MACD, Bollinger Bands,
+    value/quality/liquidity measures, and a composite factor.
+
+    Requires columns:
+      Date, Ticker, close_price, Volume
+    Uses when available:
+      trailingPE, priceToBook, returnOnEquity, profitMargins,
+      marketCap, dividendYield, priceToSalesTrailing12Months
+    """
+
+    logger.info("compute_factors called for DataFrame with %d rows", len(df))
+    try:
+        df = df.sort_values(["Ticker", "Date"]).copy()
+        # Drop duplicate columns to avoid DataFrame assignment errors
+        df = df.loc[:, ~df.columns.duplicated()]
+    except Exception as e:
+        logger.error("Failed to sort DataFrame: %s", e, exc_info=True)
+        raise
+    logger.debug("DataFrame sorted by Ticker and Date")
+
+    # Normalize price column name if provided as 'Close'
+    if "close_price" not in df.columns and "Close" in df.columns:
+        try:
+            df = df.rename(columns={"Close": "close_price"})
+            logger.warning(
+                "Renamed 'Close' to 'close_price' for factor computations")
+        except Exception as e:
+            logger.warning(
+                "Failed to rename 'Close' to 'close_price': %s", e, exc_info=True
+            )
+
+    df = _run_ticker_factors(df)
 
     # ---------- Value ----------
     logger.debug("Starting value factor calculations")
     # Earnings yield (handle zero/NaN/neg PE safely)
     if "trailingPE" in df.columns:
-        pe=pd.to_numeric(df["trailingPE"], errors="coerce")
-        df["earnings_yield"]=1.0 / pe.replace(0, np.nan)
+        df["earnings_yield"]=_safe_reciprocal(df["trailingPE"])
     else:
         logger.warning(
             "Column 'trailingPE' missing; earnings_yield set to NaN.")
         df["earnings_yield"]=np.nan
 
-    pb=pd.to_numeric(df.get("priceToBook", np.nan), errors="coerce")
-    if "priceToBook" not in df.columns:
+    if "priceToBook" in df.columns:
+        df["book_to_price"]=_safe_reciprocal(df["priceToBook"])
+    else:
         logger.warning(
             "Column 'priceToBook' missing; book_to_price set to NaN.")
-    df["book_to_price"]=1.0 / pb.replace(0, np.nan)
+        df["book_to_price"]=np.nan
     if "dividendYield" not in df.columns:
         logger.warning(
             "Column 'dividendYield' missing; dividendYield set to NaN.")
-    df["dividendYield"]=pd.to_numeric(
-        df.get("dividendYield", np.nan), errors="coerce")
+    df["dividendYield"]=_tonum(df.get("dividendYield", np.nan))
     if "priceToSalesTrailing12Months" not in df.columns:
         logger.warning(
             "Column 'priceToSalesTrailing12Months' missing; price_to_sales set to NaN.")
-    df["price_to_sales"]=pd.to_numeric(
-        df.get("priceToSalesTrailing12Months", np.nan), errors="coerce")
+    df["price_to_sales"]=_tonum(df.get("priceToSalesTrailing12Months", np.nan))
 
     # ---------- Quality ----------
     logger.debug("Starting quality factor calculations")
@@ -225,66 +341,59 @@ def compute_factors(df: pd.DataFrame) -> pd.DataFrame:
         logger.warning(
             "Column 'profitMargins' missing; quality_score may be inaccurate.")
     df["quality_score"]=(
-        pd.to_numeric(df.get("returnOnEquity", np.nan), errors="coerce")
-        + pd.to_numeric(df.get("profitMargins", np.nan), errors="coerce")
+        _tonum(df.get("returnOnEquity", np.nan))
+        + _tonum(df.get("profitMargins", np.nan))
     ) / 2.0
-    df["norm_quality_score"]=df.groupby("Date", group_keys=False)[
-        "quality_score"].transform(_safe_zscore)
+    df["norm_quality_score"]=_zscore_by(df, "quality_score")
 
     # ---------- Size / Liquidity ----------
     logger.debug("Starting size/liquidity calculations")
-    mc=pd.to_numeric(df.get("marketCap", np.nan), errors="coerce")
-    if "marketCap" not in df.columns:
-        logger.warning("Column 'marketCap' missing; log_marketCap set to NaN.")
-    df["log_marketCap"]=np.where(mc > 0, np.log(mc), np.nan)
-
-    if "Volume" not in df.columns:
-        logger.warning("Column 'Volume' missing; avg_volume_21d set to NaN.")
-        df["avg_volume_21d"]=np.nan
+    if "marketCap" in df.columns:
+        # Mask non-positive caps first so log runs once over clean input
+        mc=_tonum(df["marketCap"]).to_numpy(
+            dtype=np.float64, copy=True)
+        mc[~(mc > 0)]=np.nan
+        df["log_marketCap"]=np.log(mc, out=mc)
     else:
-        df["avg_volume_21d"]=(
-            df.groupby("Ticker")["Volume"]
-            .transform(lambda s: s.rolling(21, min_periods=5).mean())
-            .fillna(0.0)
-        )
+        logger.warning("Column 'marketCap' missing; log_marketCap set to NaN.")
+        df["log_marketCap"]=np.nan
 
-    # ---------- Amihud illiquidity ----------
-    logger.debug("Starting Amihud illiquidity calculation")
-    try:
-        returns_abs=df.groupby("Ticker")["close_price"].transform(
-            lambda s: s.pct_change().abs()
-        )
-        traded_amount=df["Volume"].replace(0, np.nan) * df["close_price"]
-        raw_impact=returns_abs / traded_amount
-        df["amihud_illiquidity"]=df.groupby("Ticker")["close_price"].transform(
-            lambda s: raw_impact.loc[s.index].rolling(21, min_periods=5).mean()
-        )
-        # Ensure zero-volume rows yield NaN as per expected behavior
-        df.loc[df["Volume"] == 0, "amihud_illiquidity"]=np.nan
-    except Exception as e:
-        logger.warning(
-            "Failed to compute amihud_illiquidity: %s", e, exc_info=True)
+    # Keep the historical column layout (liquidity after size)
+    tail = [c for c in ("avg_volume_21d", "amihud_illiquidity") if c in df.columns]
+    df = df[[c for c in df.columns if c not in tail] + tail]
 
     # ---------- Clean infinities early ----------
     logger.debug("Cleaning infinities and NaNs")
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
+    # Only float columns can hold +/-inf; rewrite just the ones that do
+    for col in df.columns[[pd.api.types.is_float_dtype(t) for t in df.dtypes]]:
+        values = df[col].to_numpy()
+        bad = np.isinf(values)
+        if bad.any():
+            df[col] = np.where(bad, np.nan, values)
 
     # ---------- Composite factor ----------
     logger.debug("Starting composite factor calculation")
     factor_cols=["return_12m", "earnings_yield", "norm_quality_score"]
 
-    for col in factor_cols:
-        if col in df.columns:
-            try:
-                df[f"z_{col}"]=df.groupby("Date", group_keys=False)[
-                    col].transform(_safe_zscore)
-            except Exception as e:
-                logger.warning(
-                    f"Failed to z-score {col}: %s", e, exc_info=True)
+    present=[c for c in factor_cols if c in df.columns]
+    try:
+        z_scores=_zscore_by(df, present)
+        for col in present:
+            df[f"z_{col}"]=z_scores[col]
+    except Exception as e:
+        logger.warning("Failed to z-score %s: %s", present, e, exc_info=True)
 
     z_cols=[f"z_{c}" for c in factor_cols if f"z_{c}" in df.columns]
     try:
-        df["factor_composite"]=df[z_cols].mean(axis=1) if z_cols else np.nan
+        if z_cols:
+            # NaN-skipping row mean of the z-scores: one sum and one count pass
+            z=df[z_cols].to_numpy(dtype=np.float64)
+            valid=~np.isnan(z)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                df["factor_composite"]=(
+                    np.where(valid, z, 0.0).sum(axis=1) / valid.sum(axis=1))
+        else:
+            df["factor_composite"]=np.nan
     except Exception as e:
         logger.warning("Failed to compute factor_composite: %s",
                        e, exc_info=True)
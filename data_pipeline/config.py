@@ -22,14 +22,10 @@ import logging
 # Standard library imports
 import os
 import tempfile
+from functools import lru_cache
 
-# Third-party imports
-try:
-    from google.cloud import secretmanager
-except ImportError:
-    secretmanager = None
-    logger.warning("google-cloud-secretmanager not installed. Secrets will not be loaded.")
-
+# Heavy third-party clients (e.g. Secret Manager) are imported lazily where
+# they are used so that importing config stays cheap for workers and tests.
 
 
 # ---------------------------------------------------------------------------
@@ -43,18 +39,35 @@ except ImportError:
 # ---------------------------------------------------------------------------
 
 
+_FALLBACK_ROOT = None
+
+
+def _fallback_root() -> str:
+    """Return a single temporary root shared by all directory fallbacks."""
+    global _FALLBACK_ROOT
+    if _FALLBACK_ROOT is None:
+        _FALLBACK_ROOT = tempfile.mkdtemp(prefix="eqae-")
+    return _FALLBACK_ROOT
+
+
 def _ensure_dir(env_var: str, default: str) -> str:
     """Return a directory path ensuring it exists.
 
     The directory is taken from the environment variable ``env_var`` when
     available. The path is created if missing. If the directory cannot be
-    created, a temporary directory is returned instead.
+    created, a subdirectory of one shared temporary root is returned instead.
+    Existing directories are detected with a single ``isdir`` check.
     """
-    path = os.path.abspath(os.environ.get(env_var, default))
+    path = os.environ.get(env_var) or default
+    if not os.path.isabs(path):
+        path = os.path.abspath(path)
+    if os.path.isdir(path):
+        return path
     try:
         os.makedirs(path, exist_ok=True)
     except OSError:
-        path = tempfile.mkdtemp()
+        path = os.path.join(_fallback_root(), env_var.lower())
+        os.makedirs(path, exist_ok=True)
     return path
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -66,6 +79,11 @@ LOG_DIR = _ensure_dir("LOG_DIR", os.path.join(BASE_DIR, "logs"))
 # PROJECT_ID = "your-gcp-project-id"
 GCP_PROJECT_ID = "equity-alpha-engine-alerts"
 
+# Look up secrets that are missing from the environment in GCP Secret Manager.
+# Single switch shared by utils.get_secret, gmail_utils and Macro_data.
+USE_GCP_SECRET_MANAGER = os.environ.get(
+    "USE_GCP_SECRET_MANAGER", "true").lower() == "true"
+
 
 # ---------------------------------------------------------------------------
 # Database configuration
@@ -117,7 +135,7 @@ GMAIL_TOKEN_FILE = os.environ.get("GMAIL_TOKEN_FILE", "token.json")
 
 
 # ---------------------------------------------------------------------------
-# Cache backend configuration (GCS-only)
+# Cache backend configuration (GCS or in-memory)
 #
 # The cache system uses Google Cloud Storage. Set the bucket name via the
 # environment variable ``CACHE_GCS_BUCKET``. Optionally, set a prefix via
@@ -125,6 +143,9 @@ GMAIL_TOKEN_FILE = os.environ.get("GMAIL_TOKEN_FILE", "token.json")
 # ---------------------------------------------------------------------------
 CACHE_GCS_BUCKET = os.environ.get("CACHE_GCS_BUCKET", "equity-bucket")
 CACHE_GCS_PREFIX = os.environ.get("CACHE_GCS_PREFIX", "")
+# "gcs" persists fundamentals to the bucket above; "memory" keeps them
+# in-process only and never imports the GCS client library.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "gcs").lower()
 
 # ---------------------------------------------------------------------------
 # Configuration settings
@@ -135,8 +156,25 @@ INITIAL_DELAY = 1  # Initial delay (seconds) before retrying a failed request
 # Delay (seconds) between API calls to avoid rate limits
 RATE_LIMIT_DELAY = 1.5
 # Concurrency for parallel API calls. Default scales with CPU cores but can be
-# overridden via the ``MAX_THREADS`` environment variable.
-MAX_THREADS = int(os.environ.get("MAX_THREADS", (os.cpu_count() or 1) * 5))
+# overridden via the ``MAX_THREADS`` environment variable. Resolved lazily via
+# ``get_max_threads()``; ``config.MAX_THREADS`` still works (see __getattr__).
+
+
+@lru_cache(maxsize=1)
+def available_cpus() -> int:
+    """Return the CPUs this process may run on (respects affinity/cgroup sets)."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+@lru_cache(maxsize=1)
+def get_max_threads() -> int:
+    """Return the thread budget for parallel API calls."""
+    return int(os.environ.get("MAX_THREADS", available_cpus() * 5))
+
+
 CACHE_EXPIRY_MINUTES = 1440  # Cache expiry time in minutes (24 hours)
 
 # Network timeout improvements
@@ -146,6 +184,15 @@ MAX_CONCURRENT_REQUESTS = int(os.environ.get("MAX_CONCURRENT_REQUESTS", 10))  #
 CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_BREAKER_FAILURE_THRESHOLD", 20))  # Failures before circuit opens
 CIRCUIT_BREAKER_TIMEOUT = int(os.environ.get("CIRCUIT_BREAKER_TIMEOUT", 300))  # 5 minutes before retry
 
+# Factor computation parallelism (joblib, optional). Per-ticker factors are
+# only fanned out across processes when numba is unavailable and the frame is
+# large enough to amortise the worker start-up and pickling cost.
+FACTOR_N_JOBS = int(os.environ.get("FACTOR_N_JOBS", -1))  # -1 = all cores, 1 = serial
+FACTOR_PARALLEL_MIN_ROWS = int(os.environ.get("FACTOR_PARALLEL_MIN_ROWS", 200_000))  # Rows before going parallel
+# Working dtype for price/volume arrays in factor kernels. "float32" halves
+# the memory traffic of the rolling loops; accumulators and outputs stay float64.
+FACTOR_DTYPE = os.environ.get("FACTOR_DTYPE", "float64")
+
 # Yfinance configuration to prevent database lock issues
 YF_DISABLE_CACHE = os.environ.get("YF_DISABLE_CACHE", "true").lower() == "true"
 YF_CACHE_DIR = os.environ.get(
@@ -168,7 +215,14 @@ If not set, defaults to INFO.
 """
 
 # --- Logging helpers (formerly in logging_config.py) ---
-VALID_LEVELS = {"CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"}
+_LEVELS = {
+    "CRITICAL": logging.CRITICAL,
+    "ERROR": logging.ERROR,
+    "WARNING": logging.WARNING,
+    "INFO": logging.INFO,
+    "DEBUG": logging.DEBUG,
+}
+VALID_LEVELS = frozenset(_LEVELS)
 
 
 def level_from_env(default: str = "INFO") -> int:
@@ -177,9 +231,7 @@ def level_from_env(default: str = "INFO") -> int:
     Returns logging level constant (e.g., logging.INFO).
     """
     raw = os.environ.get("LOG_LEVEL", default).upper()
-    if raw not in VALID_LEVELS:
-        raw = default
-    return getattr(logging, raw, logging.INFO)
+    return _LEVELS.get(raw) or _LEVELS.get(default.upper(), logging.INFO)
 
 
 def configure_logging(level: int = None) -> None:
@@ -201,29 +253,35 @@ def configure_logging(level: int = None) -> None:
 
 LOG_LEVEL = level_from_env()
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
-configure_logging(LOG_LEVEL)
+# Leave root logging alone when the host (gunicorn, uvicorn, pytest, ...) has
+# already configured it; EQAE_SKIP_LOG_CONFIG=1 opts out entirely.
+if os.environ.get("EQAE_SKIP_LOG_CONFIG") != "1" and not logging.getLogger().handlers:
+    configure_logging(LOG_LEVEL)
+
+
+# Shared formatter and per-logger set of attached log files
+_FORMATTER = logging.Formatter(LOG_FORMAT)
+_LOGGER_FILES: dict = {}
 
 
 def get_file_logger(name: str, filename: str = None):
     """Create and return a logger that writes to a file in LOG_DIR."""
     logger = logging.getLogger(name)
     logger.setLevel(LOG_LEVEL)
-    log_file = os.path.join(LOG_DIR, filename or f"{name}.log")
-    file_handler = logging.FileHandler(log_file)
-    formatter = logging.Formatter(LOG_FORMAT)
-    file_handler.setFormatter(formatter)
+    log_file = os.path.abspath(os.path.join(LOG_DIR, filename or f"{name}.log"))
     # Avoid duplicate handlers
-    if not any(
-        isinstance(h, logging.FileHandler) and getattr(
-            h, "baseFilename", None) == file_handler.baseFilename
-        for h in logger.handlers
-    ):
+    attached = _LOGGER_FILES.setdefault(name, set())
+    if log_file not in attached:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(_FORMATTER)
         logger.addHandler(file_handler)
+        attached.add(log_file)
     return logger
 
 
-# FTSE 100 Tickers List (as config)
-FTSE_100_TICKERS = [
+# FTSE 100 Tickers (as config). Kept as an ordered tuple for iteration plus a
+# frozenset for O(1) membership checks.
+FTSE_100_TICKERS = (
     "III.L",
     "ADM.L",
     "AAF.L",
@@ -324,4 +382,12 @@ FTSE_100_TICKERS = [
     "WEIR.L",
     "WTB.L",
     "WPP.L",
-]
+)
+FTSE_100_TICKERS_SET = frozenset(FTSE_100_TICKERS)
+
+
+def __getattr__(name):
+    # Lazily computed settings kept available as module attributes
+    if name == "MAX_THREADS":
+        return get_max_threads()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
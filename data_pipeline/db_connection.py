@@ -2,16 +2,28 @@
 Centralized database connection module.
 
 This module provides a reusable SQLAlchemy engine and helper functions for database operations.
+The engine and session factory are created lazily on first use (``get_engine`` /
+``get_session_local``) so that importing this module, e.g. in worker processes,
+does not open a connection pool.
 """
 
 import logging
 import os
+import random
+import threading
 import time
 import urllib.parse
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 
-from google.cloud.sql.connector import Connector
+from google.cloud.sql.connector import Connector, IPTypes
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import ArgumentError, DBAPIError
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from data_pipeline.utils import get_secret
 
@@ -23,11 +35,101 @@ logger.setLevel(logging.DEBUG)
 DEFAULT_TIMEOUT = 600  # seconds, increased for large queries and network issues
 CONNECTION_TIMEOUT = 30  # seconds, connection establishment timeout
 MAX_RETRIES = 5
-RETRY_DELAY = 10  # seconds, initial retry delay
-POOL_SIZE = 20  # Increased pool size for concurrent API requests
+BASE_DELAY = 1.0  # seconds, first retry delay (doubles per attempt)
+MAX_DELAY = 30.0  # seconds, cap on a single retry delay
+JITTER = 0.5  # +/- fraction of random jitter applied to each delay
+# Increased pool size for concurrent API requests; raise with worker count
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "20"))
 MAX_OVERFLOW = 30  # Higher overflow for peak loads
 POOL_TIMEOUT = 60  # seconds, time to wait for connection from pool
 POOL_RECYCLE = 1800  # seconds, recycle connections every 30 minutes
+SECRET_CACHE_TTL = 300  # seconds, how long a fetched DATABASE_URL is reused
+# Server-side limits so a runaway query or abandoned transaction can't pin a
+# pooled connection forever
+STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", DEFAULT_TIMEOUT * 1000))
+IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.environ.get("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "300000"))
+
+# Pool settings shared by every engine this module creates
+POOL_CONFIG = {
+    "pool_pre_ping": True,
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+    "echo": False,
+}
+
+# Set DB_POOL_MODE=null for one-shot jobs (e.g. update_financial_data run as a
+# Cloud Run job) to open connections on demand instead of keeping a pool.
+POOL_MODE = os.environ.get("DB_POOL_MODE", "pool").lower()
+
+
+def _pool_kwargs() -> dict:
+    """Return the create_engine pool arguments for the configured POOL_MODE."""
+    if POOL_MODE == "null":
+        return {"poolclass": NullPool, "echo": False}
+    return POOL_CONFIG
+
+
+@lru_cache(maxsize=8)
+def _cached_secret(name: str, epoch: int) -> str:
+    """Fetch a secret once per ``epoch`` (a TTL bucket, see ``_get_database_url``)."""
+    return get_secret(name)
+
+
+def _get_database_url() -> str:
+    """Return DATABASE_URL, re-fetching it at most every ``SECRET_CACHE_TTL`` seconds."""
+    return _cached_secret("DATABASE_URL", int(time.monotonic() // SECRET_CACHE_TTL))
+
+
+# Extra connect_args per DBAPI driver name (as reported by SQLAlchemy's URL
+# parser). Drivers not listed only receive the common ``timeout``.
+SERVER_SETTINGS = {
+    "statement_timeout": str(STATEMENT_TIMEOUT_MS),
+    "idle_in_transaction_session_timeout": str(IDLE_IN_TRANSACTION_TIMEOUT_MS),
+}
+
+# libpq drivers take server settings as "-c" options and need keepalives
+# enabled explicitly; pg8000 sends them as startup parameters and keeps
+# tcp_keepalive on by default.
+_LIBPQ_CONNECT_ARGS = {
+    "connect_timeout": CONNECTION_TIMEOUT,
+    "options": " ".join(f"-c {k}={v}" for k, v in SERVER_SETTINGS.items()),
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
+_DRIVER_CONNECT_ARGS = {
+    "psycopg2": _LIBPQ_CONNECT_ARGS,
+    "psycopg2cffi": _LIBPQ_CONNECT_ARGS,
+    "psycopg": _LIBPQ_CONNECT_ARGS,
+    "pg8000": {"startup_params": SERVER_SETTINGS},
+}
+
+# Dialect options per driver. SQLAlchemy 2.0 already batches INSERT
+# executemany into multi-row VALUES ("insertmanyvalues") for every driver
+# here; psycopg2 can additionally page UPDATE/DELETE executemany.
+_DRIVER_ENGINE_ARGS = {
+    "psycopg2": {
+        "executemany_mode": "values_plus_batch",
+        "executemany_batch_page_size": 1000,
+    },
+}
+
+
+@lru_cache(maxsize=4)
+def _driver_name(database_url: str):
+    """Return the DBAPI driver name for ``database_url`` or ``None`` if unparsable."""
+    try:
+        return make_url(database_url).get_driver_name()
+    except ArgumentError:
+        return None
+
+
+def _get_driver_engine_args(database_url: str) -> dict:
+    """Return extra ``create_engine`` dialect options for the URL's driver."""
+    return dict(_DRIVER_ENGINE_ARGS.get(_driver_name(database_url), {}))
 
 
 def _get_driver_specific_connect_args(database_url: str) -> dict:
@@ -35,46 +137,88 @@ def _get_driver_specific_connect_args(database_url: str) -> dict:
     Get driver-specific connection arguments based on the database URL.
 
     Different PostgreSQL drivers support different connection parameters:
-    - psycopg2: supports both 'timeout' and 'connect_timeout'
+    - psycopg2/psycopg: support both 'timeout' and 'connect_timeout'
     - pg8000: supports 'timeout' but not 'connect_timeout'
     """
-    connect_args = {"timeout": DEFAULT_TIMEOUT}
-
-    # Detect driver from URL
-    if "+psycopg2" in database_url or ("+pg" not in database_url and "postgresql://" in database_url):
-        # psycopg2 driver (default for postgresql://)
-        connect_args["connect_timeout"] = CONNECTION_TIMEOUT
-        logger.debug("Using psycopg2 driver connection arguments")
-    elif "+pg8000" in database_url:
-        # pg8000 driver - doesn't support connect_timeout
-        logger.debug("Using pg8000 driver connection arguments (no connect_timeout)")
-    else:
+    driver = _driver_name(database_url)
+    extra = _DRIVER_CONNECT_ARGS.get(driver)
+    if extra is None:
         # Unknown driver - use safe defaults (no connect_timeout)
         logger.warning("Unknown PostgreSQL driver detected, using safe connection arguments")
+        extra = {}
+    else:
+        logger.debug("Using %s driver connection arguments", driver)
+    return {"timeout": DEFAULT_TIMEOUT, **extra}
 
-    return connect_args
 
+# Cloud SQL connector, created on first use. The lazy refresh strategy only
+# refreshes certificates on connect instead of in a background task, and
+# nothing is opened just by importing this module.
+_connector = None
 
-# Global connector instance
-connector = Connector()
 
+def _get_connector() -> Connector:
+    """Return the process-wide Cloud SQL connector, creating it on first use."""
+    global _connector
+    if _connector is None:
+        # ip_type is chosen per connection in _make_getconn
+        _connector = Connector(refresh_strategy="lazy")
+    return _connector
+
+
+def _make_getconn(instance_name: str, parsed: "ParsedDatabaseURL"):
+    """Return the engine ``creator`` that opens pg8000 connections via the connector.
+
+    Set PRIVATE_IP to connect over the instance's private IP, and IAM_AUTH=1
+    to authenticate with the service account's IAM identity; the URL's
+    password is then not sent.
+    """
+    ip_type = IPTypes.PRIVATE if os.environ.get("PRIVATE_IP") else IPTypes.PUBLIC
+    iam_auth = os.environ.get("IAM_AUTH") == "1"
+    kwargs = {"user": parsed.user, "db": parsed.database,
+              "ip_type": ip_type, "enable_iam_auth": iam_auth,
+              "startup_params": SERVER_SETTINGS}
+    if not iam_auth:
+        kwargs["password"] = parsed.password
+
+    def getconn():
+        return _get_connector().connect(instance_name, "pg8000", **kwargs)
 
-def _parse_database_url(database_url: str) -> dict:
+    return getconn
+
+
+@dataclass(frozen=True)
+class ParsedDatabaseURL:
+    """Connection parameters extracted from a database URL."""
+
+    driver: str
+    user: Optional[str]
+    password: Optional[str]
+    host: Optional[str]
+    port: Optional[int]
+    database: str
+    query: str
+
+
+@lru_cache(maxsize=8)
+def _parse_database_url(database_url: str) -> ParsedDatabaseURL:
     """Parse database URL to extract connection parameters."""
     parsed = urllib.parse.urlparse(database_url)
-    return {
-        "driver": (parsed.scheme.split("+")[-1] if "+" in parsed.scheme else "postgresql"),
-        "user": parsed.username,
-        "password": parsed.password,
-        "host": parsed.hostname,
-        "port": parsed.port,
-        "database": parsed.path.lstrip("/"),
-        "query": parsed.query,
-    }
+    return ParsedDatabaseURL(
+        driver=(parsed.scheme.split("+")[-1] if "+" in parsed.scheme else "postgresql"),
+        user=parsed.username,
+        password=parsed.password,
+        host=parsed.hostname,
+        port=parsed.port,
+        database=parsed.path.lstrip("/"),
+        query=parsed.query,
+    )
 
 
 def _is_cloud_sql_host(host: str) -> bool:
     """Check if the host is a Cloud SQL public IP or instance name."""
+    if not host:  # e.g. sqlite URLs have no host
+        return False
     # Cloud SQL public IPs are in 34.x.x.x range
     if host.startswith("34."):
         return True
@@ -105,40 +249,61 @@ def _get_cloud_sql_instance_name():
         return None
 
 
+# PostgreSQL SQLSTATEs: connection failures worth retrying vs. credential
+# errors that will not fix themselves
+_TRANSIENT_SQLSTATES = {"08000", "08001", "08003", "08006", "57P01", "57P03"}
+_AUTH_SQLSTATES = {"28000", "28P01"}
+
+
+def _sqlstate(exc: Exception):
+    """Return the PostgreSQL SQLSTATE carried by a DBAPI error, if any."""
+    orig = getattr(exc, "orig", exc)
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if code:
+        return code
+    # pg8000 passes the server response fields as a dict
+    args = getattr(orig, "args", ())
+    if args and isinstance(args[0], dict):
+        return args[0].get("C")
+    return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Return ``False`` for errors that retrying cannot fix (bad URL, auth)."""
+    if isinstance(exc, (ArgumentError, TypeError)):
+        # Bad URL/dialect or create_engine kwargs the pool does not accept
+        return False
+    state = _sqlstate(exc)
+    if state in _AUTH_SQLSTATES:
+        return False
+    if isinstance(exc, DBAPIError):
+        return exc.connection_invalidated or state is None or state in _TRANSIENT_SQLSTATES
+    return True
+
+
+def _retry_delay(attempt: int) -> float:
+    """Capped exponential backoff with jitter for ``attempt`` (0-based)."""
+    delay = min(MAX_DELAY, BASE_DELAY * (2 ** attempt))
+    return delay * (1 + random.uniform(-JITTER, JITTER))
+
+
 def _create_engine_with_retry(
     database_url: str,
-    parsed: dict,
+    parsed: ParsedDatabaseURL,
     use_connector: bool = False,
     instance_name: str = None,
 ):
     """Create engine with retry logic for transient failures."""
     last_exception = None
     logger.info(f"Starting engine creation with retry logic (max {MAX_RETRIES} attempts)")
+    getconn = _make_getconn(instance_name, parsed) if use_connector and instance_name else None
 
     for attempt in range(MAX_RETRIES):
         logger.debug(f"Engine creation attempt {attempt + 1}/{MAX_RETRIES}")
         try:
-            if use_connector and instance_name:
-
-                def getconn():
-                    return connector.connect(
-                        instance_name,
-                        "pg8000",
-                        user=parsed["user"],
-                        password=parsed["password"],
-                        db=parsed["database"],
-                    )
-
+            if getconn is not None:
                 engine = create_engine(
-                    "postgresql+pg8000://",
-                    creator=getconn,
-                    pool_pre_ping=True,
-                    pool_size=POOL_SIZE,
-                    max_overflow=MAX_OVERFLOW,
-                    pool_timeout=POOL_TIMEOUT,
-                    pool_recycle=POOL_RECYCLE,
-                    echo=False,
-                )
+                    "postgresql+pg8000://", creator=getconn, **_pool_kwargs())
                 logger.info("SQLAlchemy engine created successfully with Cloud SQL connector.")
                 return engine
             else:
@@ -146,21 +311,20 @@ def _create_engine_with_retry(
                 engine = create_engine(
                     database_url,
                     connect_args=connect_args,
-                    pool_pre_ping=True,
-                    pool_size=POOL_SIZE,
-                    max_overflow=MAX_OVERFLOW,
-                    pool_timeout=POOL_TIMEOUT,
-                    pool_recycle=POOL_RECYCLE,
-                    echo=False,
+                    **_pool_kwargs(),
+                    **_get_driver_engine_args(database_url),
                 )
                 logger.info("SQLAlchemy engine created successfully with direct connection.")
                 return engine
         except Exception as e:
             last_exception = e
+            if not _is_retryable(e):
+                logger.error(f"Engine creation failed with a non-retryable error: {e}")
+                raise RuntimeError(f"Failed to create SQLAlchemy engine: {e}") from e
             if attempt < MAX_RETRIES - 1:
-                wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
+                wait_time = _retry_delay(attempt)
                 logger.warning(
-                    f"Engine creation attempt {attempt + 1} failed: {e}. Retrying in {wait_time} seconds..."
+                    f"Engine creation attempt {attempt + 1} failed: {e}. Retrying in {wait_time:.1f} seconds..."
                 )
                 time.sleep(wait_time)
             else:
@@ -171,18 +335,10 @@ def _create_engine_with_retry(
         f"Failed to create SQLAlchemy engine after {MAX_RETRIES} attempts: {last_exception}")
 
 
-# Initialize the SQLAlchemy engine
-def initialize_engine():
-    """Initialize and return the SQLAlchemy engine with connection pooling."""
-    logger.info("Creating SQLAlchemy engine with connection pooling and timeout.")
-
-    # Fetch and validate the DATABASE_URL
-    database_url = get_secret("DATABASE_URL")
-    if not database_url:
-        raise RuntimeError("DATABASE_URL is not set or invalid.")
-
+def _create_engine_for_url(database_url: str):
+    """Create an engine for ``database_url``, preferring the Cloud SQL connector."""
     parsed = _parse_database_url(database_url)
-    host = parsed["host"]
+    host = parsed.host
 
     # Check if we should use Cloud SQL connector
     if _is_cloud_sql_host(host):
@@ -206,60 +362,142 @@ def initialize_engine():
     return _create_engine_with_retry(database_url, parsed, use_connector=False)
 
 
-# Create a global engine instance
-engine = initialize_engine()
+# Initialize the SQLAlchemy engine
+def initialize_engine():
+    """Initialize and return the SQLAlchemy engine with connection pooling."""
+    logger.info("Creating SQLAlchemy engine with connection pooling and timeout.")
 
-# Create a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Fetch and validate the DATABASE_URL
+    database_url = _get_database_url()
+    if not database_url:
+        raise RuntimeError("DATABASE_URL is not set or invalid.")
+
+    return _create_engine_for_url(database_url)
+
+
+# Lazily created global engine and session factory
+_engine = None
+_SessionLocal = None
+_ScopedSession = None
+# Re-entrant: get_session_local() builds the engine while holding the lock
+_engine_lock = threading.RLock()
+
+
+@lru_cache(maxsize=None)
+def _engine_for_url(database_url: str):
+    """Return one shared engine per explicit database URL."""
+    return _create_engine_for_url(database_url)
+
+
+def get_engine(database_url: str = None):
+    """
+    Return the shared SQLAlchemy engine, creating it on first use.
+
+    Without ``database_url`` the engine for the configured ``DATABASE_URL`` is
+    returned. Passing a URL returns a separate engine cached per URL.
+    """
+    global _engine
+    if database_url:
+        return _engine_for_url(database_url)
+    if _engine is None:
+        with _engine_lock:
+            # Double-checked so concurrent first callers build a single pool
+            if _engine is None:
+                _engine = initialize_engine()
+    return _engine
+
+
+def get_session_local():
+    """Return the session factory bound to the global engine."""
+    global _SessionLocal
+    if _SessionLocal is None:
+        with _engine_lock:
+            if _SessionLocal is None:
+                _SessionLocal = sessionmaker(
+                    autocommit=False, autoflush=False, bind=get_engine())
+    return _SessionLocal
+
+
+def get_scoped_session():
+    """Return the thread-local session registry over ``get_session_local()``."""
+    global _ScopedSession
+    if _ScopedSession is None:
+        with _engine_lock:
+            if _ScopedSession is None:
+                _ScopedSession = scoped_session(get_session_local())
+    return _ScopedSession
+
+
+def get_thread_session():
+    """Return this thread's session, reused across calls until removed."""
+    return get_scoped_session()()
+
+
+def __getattr__(name):
+    # Keep ``from data_pipeline.db_connection import engine`` working lazily
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_session_local()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db():
-    """Provide a database session."""
-    db = SessionLocal()
+    """Provide a database session (generator, for FastAPI-style dependencies)."""
+    db = get_session_local()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def session_scope():
+    """Yield a session that is committed on success and rolled back on error.
+
+    Unlike driving ``get_db()`` by hand, the session is always closed and its
+    connection returned to the pool, even if the caller raises.
+    """
+    db = get_session_local()()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
-def reinitialize_engine(new_database_url=None):
-    """Reinitialize the engine with a new database URL."""
-    global engine, SessionLocal
+def reinitialize_engine(new_database_url=None, force_refresh=False):
+    """Reinitialize the engine with a new database URL.
+
+    With ``force_refresh`` the cached DATABASE_URL secret is discarded and
+    fetched again before the engine is rebuilt.
+    """
+    global _engine, _SessionLocal, _ScopedSession
+
+    if force_refresh:
+        _cached_secret.cache_clear()
 
     # Determine which database URL to use
-    database_url = new_database_url if new_database_url else get_secret("DATABASE_URL")
+    database_url = new_database_url if new_database_url else _get_database_url()
 
     if new_database_url:
         logger.info("Reinitializing engine with a new database URL.")
     else:
         logger.info("Reinitializing engine with the default database URL.")
 
-    parsed = _parse_database_url(database_url)
-    host = parsed["host"]
-
-    # Check if we should use Cloud SQL connector
-    if _is_cloud_sql_host(host):
-        logger.info(
-            "Detected Cloud SQL host for reinitialization, attempting to use Cloud SQL connector")
-        instance_name = _get_cloud_sql_instance_name()
-        if instance_name:
-            try:
-                engine = _create_engine_with_retry(
-                    database_url,
-                    parsed,
-                    use_connector=True,
-                    instance_name=instance_name,
-                )
-                SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-                logger.info("Engine reinitialized successfully with Cloud SQL connector.")
-                return
-            except Exception as e:
-                logger.warning(
-                    f"Failed to reinitialize engine with Cloud SQL connector: {e}. Falling back to direct connection."
-                )
-
-    # Fallback to direct connection
-    logger.info("Reinitializing with direct database connection")
-    engine = _create_engine_with_retry(database_url, parsed, use_connector=False)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    logger.info("Engine reinitialized successfully with direct connection.")
+    new_engine = _create_engine_for_url(database_url)
+    with _engine_lock:
+        old_engine, _engine = _engine, new_engine
+        _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+        old_scoped, _ScopedSession = _ScopedSession, None
+    if old_scoped is not None:
+        # Only the calling thread's session can be closed here; other
+        # threads pick up the new factory on their next get_thread_session()
+        old_scoped.remove()
+    if old_engine is not None:
+        # Release pooled connections held by the replaced engine
+        old_engine.dispose()
+    logger.info("Engine reinitialized successfully.")
@@ -1,13 +1,33 @@
+import io
+import logging
+import os
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Dict, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import (BigInteger, Boolean, Column, Date, DateTime, Float,
                         Index, Integer, MetaData, String, Table, Text,
                         create_engine, inspect, text)
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
 from pg8000.exceptions import InterfaceError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
+
+try:
+    import adbc_driver_postgresql.dbapi as adbc_pg
+    import pyarrow as pa
+    ADBC_AVAILABLE = True
+except ImportError:
+    adbc_pg = pa = None
+    ADBC_AVAILABLE = False
 
 # Updated local imports to use fallback mechanism
 try:
@@ -18,6 +38,14 @@ except ImportError:
 # Config-driven logger
 logger = config.get_file_logger(__name__)
 
+# Upserts at least this large go through COPY + a staging table on PostgreSQL
+COPY_UPSERT_MIN_ROWS = int(os.environ.get("DB_COPY_UPSERT_MIN_ROWS", "10000"))
+# Bind parameters per statement; pg8000 encodes the count as a signed int16
+MAX_BIND_PARAMS = 32767
+
+# Parallel COPY loaders for frames spanning several COPY_UPSERT_MIN_ROWS blocks
+COPY_UPSERT_WORKERS = int(os.environ.get("DB_COPY_UPSERT_WORKERS", "4"))
+
 # --- Helpers ---
 _SQL_TEXT = Text()  # For generic text columns
 _SQL_FLOAT = Float()  # For float columns
@@ -29,6 +57,17 @@ _SQL_DATE = Date()  # For date columns
 _SQL_DT = DateTime()  # For datetime columns
 
 
+# numpy/pandas dtype.kind -> SQL type; integers are sized separately
+_KIND_MAP = {
+    "b": _SQL_BOOL,
+    "f": _SQL_FLOAT,
+    "M": _SQL_DT,
+    "O": _SQL_STR,
+    "U": _SQL_STR,
+    "S": _SQL_STR,
+}
+
+
 def _sa_type_for_series(s: pd.Series, col_name: str = None):
     """
     Infer the appropriate SQLAlchemy type for a pandas Series.
@@ -36,149 +75,120 @@ def _sa_type_for_series(s: pd.Series, col_name: str = None):
     """
     # Special case for Date column
     if col_name == "Date":
-        logger.debug("Inferring DATE type for Date column")
         return _SQL_DATE
-    # Boolean columns
-    if pd.api.types.is_bool_dtype(s):
-        logger.debug("Inferring BOOL type for column")
-        return _SQL_BOOL
-    # Integer columns (choose BIGINT if max value exceeds 2**31-1)
-    if pd.api.types.is_integer_dtype(s):
-        max_val = s.max(skipna=True)
-        logger.debug(
-            "Inferring INT/BIGINT type for column, max value: %s", max_val)
-        return _SQL_BIGINT if max_val and max_val > 2**31 - 1 else _SQL_INT
-    # Float columns
-    if pd.api.types.is_float_dtype(s):
-        logger.debug("Inferring FLOAT type for column")
-        return _SQL_FLOAT
-    # Datetime columns
-    if pd.api.types.is_datetime64_any_dtype(s) or pd.api.types.is_datetime64_ns_dtype(s):
-        logger.debug("Inferring DATETIME type for column")
-        return _SQL_DT
-    # String columns
-    if pd.api.types.is_string_dtype(s):
-        logger.debug("Inferring STRING type for column")
-        return _SQL_STR
-    # Fallback: treat as generic text
-    logger.debug("Inferring TEXT type for column")
-    return _SQL_TEXT
+    kind = s.dtype.kind
+    if kind in "iu":
+        # Size from the dtype; only uint32 can overflow INT without being 64-bit
+        itemsize = s.dtype.itemsize
+        if itemsize >= 8:
+            return _SQL_BIGINT
+        if kind == "u" and itemsize == 4:
+            max_val = s.max(skipna=True)
+            return _SQL_BIGINT if pd.notna(max_val) and max_val > 2**31 - 1 else _SQL_INT
+        return _SQL_INT
+    # Anything unrecognised is stored as generic text
+    return _KIND_MAP.get(kind, _SQL_TEXT)
 
 
 def _records(df: pd.DataFrame):
     """
     Convert DataFrame to list of dicts, replacing NaN with None for DB NULL.
     """
-    logger.debug(
-        "Converting DataFrame to records for DB insert, shape: %s", df.shape)
-    return df.where(pd.notna(df), None).to_dict(orient="records")
+    cols = df.columns.tolist()
+    arrays = []
+    for i in range(len(cols)):
+        s = df.iloc[:, i]
+        # object arrays hold Python scalars; only null-capable columns need masking
+        if s.dtype.kind == "M":
+            # Vectorised datetime64 -> datetime.datetime (what the drivers
+            # adapt natively), rather than boxing a Timestamp per cell
+            arr = s.array.to_pydatetime()
+        else:
+            arr = s.to_numpy(dtype=object)
+        if not (isinstance(s.dtype, np.dtype) and s.dtype.kind in "biu"):
+            mask = s.isna().to_numpy()
+            if mask.any():
+                arr[mask] = None
+        arrays.append(arr)
+    # Local aliases skip a global lookup per row in the comprehension
+    dict_, zip_ = dict, zip
+    return [dict_(zip_(cols, row)) for row in zip(*arrays)]
 
 
-def _chunked_insert(conn, stmt, df: pd.DataFrame, chunksize: int = 900) -> None:
+def _safe_chunksize(chunksize: int, n_cols: int) -> int:
     """
-    Helper to insert DataFrame in chunks using the given statement.
-    Includes retry logic for database lock errors and performance tracking.
+    Cap ``chunksize`` so a multi-row statement stays within MAX_BIND_PARAMS.
     """
-    max_retries = 5  # Increased retries for better reliability
-    retry_delay = 0.5  # Reduced initial delay for faster retries
-
-    total_chunks = (len(df) + chunksize - 1) // chunksize
-    logger.info(
-        "Processing %d chunks of size %d (%d total rows)",
-        total_chunks,
-        chunksize,
-        len(df),
-    )
-
-    chunk_start_time = time.time()
-    for chunk_idx, (_, chunk) in enumerate(df.groupby(df.index // chunksize)):
-        chunk_time = time.time()
-        data = _records(chunk)
-        logger.debug(
-            "Processing chunk %d/%d with %d records",
-            chunk_idx + 1,
-            total_chunks,
-            len(data),
-        )
+    return max(1, min(chunksize, MAX_BIND_PARAMS // max(1, n_cols)))
 
-        for attempt in range(max_retries):
-            try:
-                conn.execute(stmt, data)
-                chunk_elapsed = time.time() - chunk_time
-                logger.info(
-                    "Chunk %d/%d inserted in %.2f seconds (%.1f rows/sec)",
-                    chunk_idx + 1,
-                    total_chunks,
-                    chunk_elapsed,
-                    len(data) / chunk_elapsed if chunk_elapsed > 0 else 0,
-                )
-                # Log progress every 5 chunks or for the last chunk
-                if chunk_idx % 5 == 0 or chunk_idx == total_chunks - 1:
-                    elapsed = time.time() - chunk_start_time
-                    rows_processed = (chunk_idx + 1) * chunksize
-                    rate = rows_processed / elapsed if elapsed > 0 else 0
-                    logger.info(
-                        "Inserted chunk %d/%d (%d/%d rows, %.1f rows/sec)",
-                        chunk_idx + 1,
-                        total_chunks,
-                        min(rows_processed, len(df)),
-                        len(df),
-                        rate,
-                    )
-                break  # Success, exit retry loop
-            except OperationalError as e:
-                if "database is locked" in str(e).lower() and attempt < max_retries - 1:
-                    logger.warning(
-                        "Database locked, retrying insert in %s seconds (attempt %d/%d): %s",
-                        retry_delay,
-                        attempt + 1,
-                        max_retries,
-                        e,
-                    )
-                    time.sleep(retry_delay)
-                    # Capped exponential backoff
-                    retry_delay = min(retry_delay * 1.5, 5.0)
-                else:
-                    logger.error(
-                        "Failed to insert chunk into '%s' after %d attempts: %s",
-                        getattr(stmt, "table", None) or getattr(
-                            stmt, "name", None),
-                        max_retries,
-                        e,
-                        exc_info=True,
-                    )
-                    raise
-            except InterfaceError as e:
-                if attempt < max_retries - 1:
-                    logger.warning(
-                        "Network error during insert, retrying in %s seconds (attempt %d/%d): %s",
-                        retry_delay,
-                        attempt + 1,
-                        max_retries,
-                        e,
-                    )
-                    time.sleep(retry_delay)
-                    # Exponential backoff for network issues, increased max delay
-                    retry_delay = min(retry_delay * 2, 30.0)
-                else:
-                    logger.error(
-                        "Failed to insert chunk into '%s' after %d attempts due to network error: %s",
-                        getattr(stmt, "table", None) or getattr(
-                            stmt, "name", None),
-                        max_retries,
-                        e,
-                        exc_info=True,
-                    )
-                    raise
-            except Exception as e:
-                logger.error(
-                    "Failed to insert chunk into '%s': %s",
-                    getattr(stmt, "table", None) or getattr(
-                        stmt, "name", None),
-                    e,
-                    exc_info=True,
-                )
-                raise
+
+def _engine_kwargs(db_url: str) -> dict:
+    """
+    Engine arguments for a DBHelper-owned engine. Server databases get the
+    same bounded pool settings as the shared engine in db_connection.
+    """
+    if make_url(db_url).get_backend_name() == "sqlite":
+        # SQLite pools don't take size limits
+        return {"pool_pre_ping": True}
+    from data_pipeline.db_connection import (_get_driver_engine_args,
+                                             _pool_kwargs)
+
+    return {**_pool_kwargs(), **_get_driver_engine_args(db_url)}
+
+
+def _coerce_int_columns(df: pd.DataFrame, tbl: Table) -> pd.DataFrame:
+    """
+    Cast float columns bound for integer table columns to nullable Int64.
+    A NaN promotes an int column to float64, which to_csv renders as
+    ``100.0`` and COPY rejects for INTEGER/BIGINT; values are rounded as
+    PostgreSQL's assignment cast on the INSERT path would.
+    """
+    cols = [
+        col for col in df.columns
+        if col in tbl.c and isinstance(tbl.c[col].type, Integer)
+        and df[col].dtype.kind == "f"
+    ]
+    if not cols:
+        return df
+    df = df.copy()
+    for col in cols:
+        df[col] = df[col].round().astype("Int64")
+    return df
+
+
+def _copy_csv(cur, staging: str, col_list: str, df: pd.DataFrame) -> None:
+    """
+    COPY ``df`` into ``staging`` over a raw DBAPI cursor. NaN/None are
+    written as \\N so they load as NULL while empty strings stay empty.
+    """
+    copy_sql = f"COPY {staging} ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    payload = io.StringIO(df.to_csv(index=False, header=False, na_rep="\\N"))
+    if hasattr(cur, "copy_expert"):  # psycopg2
+        cur.copy_expert(copy_sql, payload)
+    else:  # pg8000
+        cur.execute(copy_sql, stream=payload)
+
+
+# reltuples is an estimate (-1 if never analysed), so only a positive value
+# is trusted to mean "has rows"; otherwise create_table runs an EXISTS probe
+_PG_PROBE_SQL = text("""
+    SELECT c.oid IS NOT NULL,
+           COALESCE(c.reltuples > 0, false),
+           (SELECT array_agg(a.attname::text) FROM pg_attribute a
+             WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped),
+           (SELECT array_agg(i.relname::text) FROM pg_index x
+              JOIN pg_class i ON i.oid = x.indexrelid
+             WHERE x.indrelid = c.oid AND x.indisvalid)
+    FROM (SELECT to_regclass(quote_ident(:name)) AS oid) r
+    LEFT JOIN pg_class c ON c.oid = r.oid
+""")
+
+# A failed or cancelled CREATE INDEX CONCURRENTLY leaves an INVALID index
+# behind, which IF NOT EXISTS would then treat as already built
+_PG_INVALID_INDEX_SQL = text("""
+    SELECT NOT x.indisvalid FROM pg_index x
+    WHERE x.indexrelid = to_regclass(quote_ident(:name))
+""")
 
 
 # --- Main DBHelper ---
@@ -204,21 +214,30 @@ class DBHelper:
             # Create dedicated engine for custom URL (used by API endpoints and
             # tests)
             self.database_url = db_url
-            self.engine = create_engine(db_url, pool_pre_ping=True)
+            self.engine = create_engine(db_url, **_engine_kwargs(db_url))
             self._own_engine = True  # Track that we own this engine
             session_factory = sessionmaker(
                 autocommit=False, autoflush=False, bind=self.engine)
         else:
             # Use global engine (used by data pipeline)
-            from data_pipeline.db_connection import SessionLocal, engine
+            from data_pipeline.db_connection import (get_engine,
+                                                     get_session_local)
 
             self.database_url = "using_global_engine"
-            self.engine = engine
+            self.engine = get_engine()
             self._own_engine = False  # We don't own the global engine
-            session_factory = SessionLocal
+            session_factory = get_session_local()
 
         self.inspector = inspect(self.engine)
         self.session = session_factory()
+        # Reflected tables, shared across inserts to avoid re-reflecting
+        self.metadata = MetaData()
+        self._table_cache: Dict[str, Table] = {}
+        # Column/index names per table; dropped whenever we issue DDL
+        self._col_cache: Dict[str, set] = {}
+        self._idx_cache: Dict[str, set] = {}
+        # Upsert statements keyed by (table, unique_cols, columns)
+        self._upsert_cache: Dict[tuple, object] = {}
         logger.info("DBHelper initialized with database URL: %s",
                     self.database_url)
 
@@ -236,59 +255,60 @@ class DBHelper:
         """
         table_created = False
         table_empty = False
+        schema_changed = False
 
         try:
-            # Rollback any pending failed transaction
-            try:
-                self.session.rollback()
-            except Exception:
-                pass  # Ignore if no transaction
-
-            # Use session for ORM-based operations
-            with self.session.begin():
+            # Schema DDL runs on its own autocommit connection so it never
+            # ties up (or closes) the helper's ORM session
+            with self.engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT") as conn:
                 logger.info("Creating table '%s' if not exists.", table_name)
-                if self.inspector.has_table(table_name):
+                probe = None
+                if table_name in self._col_cache:
+                    exists = True
+                elif self.engine.dialect.name == "postgresql":
+                    # One catalog round trip instead of has_table/get_columns/get_indexes
+                    probe = self._probe_table(table_name, conn)
+                    exists = probe["exists"]
+                else:
+                    exists = self.inspector.has_table(table_name)
+                if exists:
                     # Check if table is empty
                     try:
-                        count_result = pd.read_sql(
-                            f"SELECT COUNT(*) as count FROM {table_name}", self.engine)
-                        row_count = count_result["count"].iloc[0]
-                        if row_count == 0:
+                        if probe and probe["approx_nonempty"]:
+                            has_rows = True
+                        else:
+                            # EXISTS stops at the first row instead of counting them all
+                            quoted = self.engine.dialect.identifier_preparer.quote_identifier(
+                                table_name)
+                            has_rows = conn.exec_driver_sql(
+                                f"SELECT EXISTS (SELECT 1 FROM {quoted} LIMIT 1)").scalar()
+                        if not has_rows:
                             table_empty = True
                             logger.info(
-                                "Table '%s' exists but is empty (%d rows).",
-                                table_name,
-                                row_count,
-                            )
+                                "Table '%s' exists but is empty.", table_name)
                     except Exception as e:
                         logger.warning(
                             "Could not check if table '%s' is empty: %s", table_name, e)
 
                     # add only missing columns
-                    existing = {c["name"]
-                                for c in self.inspector.get_columns(table_name)}
-                    for col in df.columns:
-                        if col in existing:
-                            continue
-                        col_type = _sa_type_for_series(df[col], col)
+                    existing = self._columns(table_name)
+                    missing = [col for col in df.columns if col not in existing]
+                    schema_changed = bool(missing)
+                    if missing:
                         logger.info(
-                            "Adding missing column '%s' to table '%s'", col, table_name)
+                            "Adding missing columns %s to table '%s'", missing, table_name)
                         try:
-                            alter_stmt = text(f"ALTER TABLE \"{table_name}\" ADD COLUMN \"{col}\" {col_type.compile(self.engine.dialect)}")
-                            self.session.execute(alter_stmt)
+                            for alter_stmt in self._add_columns_ddl(table_name, df, missing):
+                                conn.execute(alter_stmt)
                         except Exception as e:
                             logger.error(
-                                "Failed to add column '%s' to table '%s': %s",
-                                col,
+                                "Failed to add columns %s to table '%s': %s",
+                                missing,
                                 table_name,
                                 e,
                                 exc_info=True,
                             )
-                            self.session.rollback()
-                    # ensure UNIQUE index for upsert if requested
-                    if unique_cols:
-                        self._ensure_unique_index(
-                            self.session, table_name, tuple(unique_cols))
                 else:
                     # create new table
                     table_created = True
@@ -303,20 +323,30 @@ class DBHelper:
                                 quote=True,
                             )
                         )
-                    table = Table(table_name, MetaData(), *cols)
-                    MetaData().create_all(self.engine, tables=[table])
+                    # Clear stale schema first, then keep the new Table as the
+                    # cached definition so inserts needn't reflect it back
+                    self._invalidate_table(table_name)
+                    table = Table(table_name, self.metadata, *cols)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Inferred types for '%s': %s", table_name,
+                                     {c.name: str(c.type) for c in cols})
+                    self.metadata.create_all(conn, tables=[table])
+                    self._table_cache[table_name] = table
                     logger.info("Table '%s' created.", table_name)
 
-                    # add unique index if needed (for upsert)
-                    if unique_cols:
-                        self._ensure_unique_index(
-                            self.session, table_name, tuple(unique_cols))
+            # ensure UNIQUE index for upsert if requested; the ALTERs above
+            # have already committed, so the index sees any columns just added
+            if unique_cols:
+                if schema_changed:
+                    self._invalidate_table(table_name)
+                self._ensure_unique_index(table_name, tuple(unique_cols))
         except Exception as e:
             logger.error("Failed to create table '%s': %s",
                          table_name, e, exc_info=True)
-            self.session.rollback()
         finally:
-            self.session.close()
+            if schema_changed:
+                # Refresh cached schema only after the ALTERs have committed
+                self._invalidate_table(table_name)
 
         # Trigger data population if table was created or is empty
         if auto_populate and (table_created or table_empty) and table_name == "financial_tbl":
@@ -327,6 +357,25 @@ class DBHelper:
             )
             self._trigger_data_population()
 
+    def _add_columns_ddl(self, table_name: str, df: pd.DataFrame, cols: Sequence[str]):
+        """
+        Build ALTER TABLE statements adding ``cols``: one statement for all
+        columns, or one per column on SQLite, which allows a single ADD only.
+        """
+        dialect = self.engine.dialect
+        table = dialect.identifier_preparer.quote_identifier(table_name)
+        # IF NOT EXISTS keeps concurrent pipeline runs from tripping on each other
+        add = "ADD COLUMN IF NOT EXISTS " if dialect.name == "postgresql" else "ADD COLUMN "
+        clauses = [
+            add + str(CreateColumn(
+                Column(col, _sa_type_for_series(df[col], col), quote=True)
+            ).compile(dialect=dialect))
+            for col in cols
+        ]
+        if dialect.name == "sqlite":
+            return [text(f"ALTER TABLE {table} {clause}") for clause in clauses]
+        return [text(f"ALTER TABLE {table} " + ", ".join(clauses))]
+
     def _trigger_data_population(self):
         """Trigger the data population pipeline for financial data using default 10 years."""
         if DBHelper._population_running:
@@ -367,25 +416,135 @@ class DBHelper:
         finally:
             DBHelper._population_running = False
 
-    def _ensure_unique_index(self, conn, table_name: str, cols: tuple[str, ...]):
+    def _table(self, table_name: str, conn=None) -> Table:
+        """
+        Return the reflected table, reflecting it only on first use (over
+        ``conn`` when given, so no second connection is checked out).
+        """
+        tbl = self._table_cache.get(table_name)
+        if tbl is None:
+            tbl = Table(table_name, self.metadata,
+                        autoload_with=self.engine if conn is None else conn)
+            self._table_cache[table_name] = tbl
+        return tbl
+
+    def _probe_table(self, table_name: str, conn) -> dict:
+        """
+        PostgreSQL only: fetch existence, a planner-statistics row estimate,
+        column names and index names in a single catalog query over the
+        caller's open ``conn``, filling the column/index caches for an
+        existing table.
+        """
+        row = conn.execute(_PG_PROBE_SQL, {"name": table_name}).one()
+        exists, approx_nonempty, cols, indexes = row
+        if exists:
+            self._col_cache[table_name] = set(cols or ())
+            self._idx_cache[table_name] = set(indexes or ())
+        return {"exists": bool(exists), "approx_nonempty": bool(approx_nonempty)}
+
+    def _columns(self, table_name: str) -> set:
+        """
+        Return the table's column names, querying the inspector only on a miss.
+        """
+        cols = self._col_cache.get(table_name)
+        if cols is None:
+            cols = {c["name"] for c in self.inspector.get_columns(table_name)}
+            self._col_cache[table_name] = cols
+        return cols
+
+    def _index_names(self, table_name: str) -> set:
+        """
+        Return the table's index names, querying the inspector only on a miss.
+        """
+        names = self._idx_cache.get(table_name)
+        if names is None:
+            names = {i["name"] for i in self.inspector.get_indexes(table_name)}
+            self._idx_cache[table_name] = names
+        return names
+
+    def _invalidate_table(self, table_name: str) -> None:
+        """
+        Forget cached schema for a table so the next use sees DDL changes.
+        """
+        self._table_cache.pop(table_name, None)
+        self._col_cache.pop(table_name, None)
+        self._idx_cache.pop(table_name, None)
+        for key in [k for k in self._upsert_cache if k[0] == table_name]:
+            del self._upsert_cache[key]
+        # The inspector memoizes has_table/get_columns/get_indexes too
+        self.inspector.clear_cache()
+        tbl = self.metadata.tables.get(table_name)
+        if tbl is not None:
+            self.metadata.remove(tbl)
+
+    def _ensure_unique_index(self, table_name: str, cols: tuple[str, ...]):
         """
         Ensure a unique index exists for the given columns.
+        On PostgreSQL the index is built CONCURRENTLY (no write lock) and then
+        attached as a UNIQUE constraint so it is a well-defined upsert arbiter.
         """
         idx_name = f"uq_{table_name}_{'_'.join(cols)}"
-        existing = {i["name"] for i in self.inspector.get_indexes(table_name)}
-        if idx_name not in existing:
-            tbl = Table(table_name, MetaData(), autoload_with=self.engine)
-            Index(idx_name, *[tbl.c[c]
-                  for c in cols], unique=True).create(conn)
-            logger.info("Created unique index '%s' on table '%s'",
-                        idx_name, table_name)
+        if idx_name in self._index_names(table_name):
+            return
+        if self.engine.dialect.name == "postgresql":
+            quote = self.engine.dialect.identifier_preparer.quote_identifier
+            q_table, q_idx = quote(table_name), quote(idx_name)
+            q_cols = ", ".join(quote(c) for c in cols)
+            # CONCURRENTLY cannot run inside a transaction block
+            with self.engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT") as conn:
+                drop = f"DROP INDEX CONCURRENTLY IF EXISTS {q_idx}"
+                if conn.execute(_PG_INVALID_INDEX_SQL, {"name": idx_name}).scalar():
+                    logger.warning(
+                        "Dropping invalid index '%s' left by an earlier build", idx_name)
+                    conn.exec_driver_sql(drop)
+                try:
+                    conn.exec_driver_sql(
+                        f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {q_idx} "
+                        f"ON {q_table} ({q_cols})")
+                except DBAPIError:
+                    # e.g. duplicate keys: don't leave the half-built index behind
+                    conn.exec_driver_sql(drop)
+                    raise
+                try:
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {q_table} ADD CONSTRAINT {q_idx} "
+                        f"UNIQUE USING INDEX {q_idx}")
+                except DBAPIError as e:
+                    # Constraint already attached (e.g. a concurrent run), or
+                    # any other driver error class the DBAPI reports it as
+                    logger.debug("Unique constraint '%s' not added: %s", idx_name, e)
+        else:
+            tbl = self._table(table_name)
+            with self.engine.begin() as conn:
+                Index(idx_name, *[tbl.c[c] for c in cols],
+                      unique=True).create(conn, checkfirst=True)
+        self._invalidate_table(table_name)
+        logger.info("Created unique index '%s' on table '%s'",
+                    idx_name, table_name)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Yield one connection inside a single transaction for a batch of
+        writes. Pass it as ``conn`` to insert_row/insert_dataframe; it
+        commits when the block exits cleanly and rolls back otherwise.
+        """
+        with self.engine.begin() as conn:
+            yield conn
 
-    def insert_row(self, table_name: str, row_dict: Dict) -> None:
+    def insert_row(self, table_name: str, row_dict: Dict, conn=None) -> None:
         """
         Insert a single row into a table.
+        With ``conn`` (see transaction()) errors propagate so the caller's
+        transaction can roll back.
         """
-        logger.debug("Inserting row into '%s': %s", table_name, row_dict)
-        tbl = Table(table_name, MetaData(), autoload_with=self.engine)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Inserting row into '%s': %s", table_name, row_dict)
+        tbl = self._table(table_name, conn)
+        if conn is not None:
+            conn.execute(tbl.insert(), [row_dict])
+            return
         with self.engine.begin() as conn:
             try:
                 conn.execute(tbl.insert(), [row_dict])
@@ -393,17 +552,254 @@ class DBHelper:
                 logger.error("Failed to insert row into '%s': %s",
                              table_name, e, exc_info=True)
 
+    def _upsert_stmt(
+        self,
+        tbl: Table,
+        unique_cols: tuple[str, ...],
+        columns: tuple[str, ...],
+        update_on_conflict: bool = True,
+    ):
+        """
+        Return the dialect's upsert statement for ``tbl``, built once per
+        (table, unique_cols, columns, update_on_conflict) and reused so
+        SQLAlchemy's compiled cache hits. Only ``columns`` are updated on
+        conflict; with ``update_on_conflict=False`` conflicting rows are left
+        untouched. Returns None for dialects without a native upsert.
+        """
+        key = (tbl.name, unique_cols, columns, update_on_conflict)
+        if key in self._upsert_cache:
+            return self._upsert_cache[key]
+
+        dialect_name = getattr(self.engine.dialect, "name", "")
+        update_cols = [
+            col for col in columns if col not in unique_cols
+        ] if update_on_conflict else []
+        if dialect_name == "postgresql":
+            insert_stmt = pg_insert(tbl)
+            stmt = insert_stmt.on_conflict_do_update(
+                index_elements=list(unique_cols),
+                set_={col: insert_stmt.excluded[col] for col in update_cols},
+            ) if update_cols else insert_stmt.on_conflict_do_nothing(
+                index_elements=list(unique_cols))
+        elif dialect_name == "mysql":
+            insert_stmt = mysql_insert(tbl)
+            stmt = insert_stmt.on_duplicate_key_update(
+                {col: insert_stmt.inserted[col] for col in (update_cols or unique_cols)})
+        elif dialect_name == "sqlite":
+            stmt = sqlite_insert(tbl).prefix_with(
+                "OR REPLACE" if update_on_conflict else "OR IGNORE")
+        else:
+            stmt = None
+        self._upsert_cache[key] = stmt
+        return stmt
+
+    def _adbc_uri(self) -> Optional[str]:
+        """
+        libpq URI for ADBC ingestion, or None when ADBC isn't installed or the
+        helper wasn't built from a PostgreSQL URL (e.g. the Cloud SQL
+        connector engine, which has no URI to hand over).
+        """
+        if not ADBC_AVAILABLE or not self._own_engine:
+            return None
+        url = make_url(self.database_url)
+        if url.get_backend_name() != "postgresql":
+            return None
+        return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+    def _ingest_adbc(self, table_name: str, df: pd.DataFrame) -> None:
+        """
+        Append ``df`` as an Arrow table; ADBC streams it over binary COPY
+        without building per-row Python objects.
+        """
+        data = pa.Table.from_pandas(df, preserve_index=False)
+        with adbc_pg.connect(self._adbc_uri()) as conn:
+            with conn.cursor() as cur:
+                cur.adbc_ingest(table_name, data, mode="append")
+            conn.commit()
+
+    def _copy_append(self, table_name: str, df: pd.DataFrame, conn=None) -> None:
+        """
+        Append ``df`` with a single COPY ... FROM STDIN in one transaction,
+        or inside ``conn``'s open transaction when given. PostgreSQL only.
+        """
+        df = _coerce_int_columns(df, self._table(table_name, conn))
+        quote = self.engine.dialect.identifier_preparer.quote
+        col_list = ", ".join(quote(col) for col in df.columns)
+        if conn is not None:
+            _copy_csv(conn.connection.cursor(), quote(table_name), col_list, df)
+            return
+        raw = self.engine.raw_connection()
+        try:
+            _copy_csv(raw.cursor(), quote(table_name), col_list, df)
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+
+    def _copy_upsert_sql(
+        self,
+        table_name: str,
+        columns: Sequence[str],
+        unique_cols: Sequence[str],
+        update_on_conflict: bool = True,
+    ) -> tuple[str, str, str]:
+        """
+        Return the quoted target table, column list and ON CONFLICT clause
+        for a COPY-based upsert.
+        """
+        quote = self.engine.dialect.identifier_preparer.quote
+        col_list = ", ".join(quote(col) for col in columns)
+        update_clause = ", ".join(
+            f"{quote(col)} = EXCLUDED.{quote(col)}"
+            for col in columns if col not in unique_cols
+        ) if update_on_conflict else ""
+        on_conflict = f"ON CONFLICT ({', '.join(quote(col) for col in unique_cols)}) " + (
+            f"DO UPDATE SET {update_clause}" if update_clause else "DO NOTHING"
+        )
+        return quote(table_name), col_list, on_conflict
+
+    def _bulk_upsert_copy(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        unique_cols: Sequence[str],
+        update_on_conflict: bool = True,
+    ) -> None:
+        """
+        Upsert via COPY into a temp staging table, then one set-based
+        INSERT ... SELECT ... ON CONFLICT. PostgreSQL only.
+        """
+        df = _coerce_int_columns(df, self._table(table_name))
+        workers = min(COPY_UPSERT_WORKERS, len(df) // COPY_UPSERT_MIN_ROWS)
+        if workers > 1:
+            self._parallel_upsert_copy(
+                table_name, df, unique_cols, workers, update_on_conflict)
+            return
+
+        target, col_list, on_conflict = self._copy_upsert_sql(
+            table_name, df.columns, unique_cols, update_on_conflict)
+        staging = self.engine.dialect.identifier_preparer.quote(
+            f"stg_{table_name}_{uuid.uuid4().hex[:8]}")
+
+        max_retries = 5
+        retry_delay = 2.0
+        for attempt in range(max_retries):
+            raw = self.engine.raw_connection()
+            try:
+                cur = raw.cursor()
+                cur.execute(
+                    f"CREATE TEMP TABLE {staging} "
+                    f"(LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                _copy_csv(cur, staging, col_list, df)
+                cur.execute(
+                    f"INSERT INTO {target} ({col_list}) "
+                    f"SELECT {col_list} FROM {staging} {on_conflict}"
+                )
+                raw.commit()
+                logger.info(
+                    "COPY upsert of %d rows into '%s' completed", len(df), table_name)
+                return
+            except InterfaceError as e:
+                raw.rollback()
+                if attempt < max_retries - 1:
+                    logger.warning(
+                        "Network error during COPY upsert, retrying in %s seconds (attempt %d/%d): %s",
+                        retry_delay, attempt + 1, max_retries, e,
+                    )
+                    time.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, 30.0)
+                else:
+                    logger.error(
+                        "Failed COPY upsert into '%s' after %d attempts due to network error: %s",
+                        table_name, max_retries, e, exc_info=True,
+                    )
+                    raise
+            except Exception:
+                raw.rollback()
+                raise
+            finally:
+                raw.close()
+
+    def _parallel_upsert_copy(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        unique_cols: Sequence[str],
+        workers: int,
+        update_on_conflict: bool = True,
+    ) -> None:
+        """
+        COPY row ranges of ``df`` into per-worker UNLOGGED staging tables on
+        separate pooled connections, then merge them with a single
+        INSERT ... SELECT ... UNION ALL ... ON CONFLICT.
+        """
+        target, col_list, on_conflict = self._copy_upsert_sql(
+            table_name, df.columns, unique_cols, update_on_conflict)
+        quote = self.engine.dialect.identifier_preparer.quote
+        suffix = uuid.uuid4().hex[:8]
+        step = -(-len(df) // workers)
+        parts = [
+            (quote(f"stg_{table_name}_{suffix}_{i}"), df.iloc[start:start + step])
+            for i, start in enumerate(range(0, len(df), step))
+        ]
+
+        def load(part):
+            # Staging tables must outlive this connection, so no TEMP here
+            staging, chunk = part
+            raw = self.engine.raw_connection()
+            try:
+                cur = raw.cursor()
+                cur.execute(
+                    f"CREATE UNLOGGED TABLE {staging} (LIKE {target} INCLUDING DEFAULTS)")
+                _copy_csv(cur, staging, col_list, chunk)
+                raw.commit()
+            except Exception:
+                raw.rollback()
+                raise
+            finally:
+                raw.close()
+
+        logger.info(
+            "COPY upsert of %d rows into '%s' across %d staging tables",
+            len(df), table_name, len(parts),
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+                list(pool.map(load, parts))
+            union = " UNION ALL ".join(
+                f"SELECT {col_list} FROM {staging}" for staging, _ in parts)
+            with self.engine.begin() as conn:
+                conn.exec_driver_sql(
+                    f"INSERT INTO {target} ({col_list}) {union} {on_conflict}")
+            logger.info(
+                "COPY upsert of %d rows into '%s' completed", len(df), table_name)
+        finally:
+            with self.engine.begin() as conn:
+                for staging, _ in parts:
+                    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {staging}")
+
     def insert_dataframe(
         self,
         table_name: str,
         df: pd.DataFrame,
         unique_cols: Optional[Sequence[str]] = None,
         chunksize: int = 900,  # Reduced to 900 to stay within pg8000 parameter limits
+        update_on_conflict: bool = True,
+        conn=None,
     ) -> None:
         """
         Insert a DataFrame into a table, using upsert if unique_cols are provided.
         Only PostgreSQL (GCP Cloud SQL) is supported.
         Optimized for large datasets with larger chunks and better connection handling.
+        Pass ``update_on_conflict=False`` to keep existing rows as they are
+        (ON CONFLICT DO NOTHING), which avoids rewriting unchanged rows when
+        re-ingesting overlapping windows.
+        Pass a ``conn`` from transaction() to write inside the caller's
+        transaction; the COPY-staging and ADBC paths and network retries
+        are then skipped, since the caller owns commit and rollback.
         """
         if df.empty:
             logger.info(
@@ -411,6 +807,8 @@ class DBHelper:
             return
 
         start_time = time.time()
+        # Wide frames need smaller batches to stay under the bind-parameter limit
+        chunksize = _safe_chunksize(chunksize, len(df.columns))
         logger.info(
             "Starting bulk insert of %d rows into '%s' with chunksize %d",
             len(df),
@@ -423,9 +821,21 @@ class DBHelper:
             df = df.copy()
             df['Date'] = df['Date'].dt.date
 
-        tbl = Table(table_name, MetaData(), autoload_with=self.engine)
+        tbl = self._table(table_name, conn)
 
-        if unique_cols:
+        if (
+            unique_cols
+            and conn is None
+            and len(df) >= COPY_UPSERT_MIN_ROWS
+            and getattr(self.engine.dialect, "name", "") == "postgresql"
+        ):
+            logger.info(
+                "Upserting DataFrame into '%s' (%d rows) via COPY staging table",
+                table_name,
+                len(df),
+            )
+            self._bulk_upsert_copy(table_name, df, unique_cols, update_on_conflict)
+        elif unique_cols:
             logger.info(
                 "Upserting DataFrame into '%s' (%d rows) with unique columns: %s",
                 table_name,
@@ -433,78 +843,22 @@ class DBHelper:
                 unique_cols,
             )
 
-            # Properly quote column names
-            def quote_ident(col: str) -> str:
-                if getattr(self.engine.dialect, "name", "") == "mysql":
-                    return f"`{col}`"
-                return f'"{col}"'
-
-            quoted_columns = [quote_ident(col) for col in df.columns]
-            quoted_unique_cols = [quote_ident(col) for col in unique_cols]
-            non_unique_cols = [
-                col for col in df.columns if col not in unique_cols]
-
-            dialect_name = getattr(self.engine, "dialect", None)
-            dialect_name = getattr(dialect_name, "name", "")
-
-            # Helper to render SQL literals safely for basic types
-            def _sql_literal(val):
-                import pandas as _pd
-                import datetime
-
-                if val is None or (_pd.isna(val) if hasattr(_pd, "isna") else False):
-                    return "NULL"
-                if isinstance(val, str):
-                    return "'" + val.replace("'", "''") + "'"
-                if isinstance(val, datetime.date) and not isinstance(val, datetime.datetime):
-                    return "'" + val.strftime('%Y-%m-%d') + "'"
-                if isinstance(val, (_pd.Timestamp, _pd.Timedelta, datetime.datetime)) or hasattr(val, 'strftime'):
-                    return "'" + val.strftime('%Y-%m-%d %H:%M:%S') + "'"
-                return str(val)
+            dialect_name = getattr(self.engine.dialect, "name", "")
+            stmt = self._upsert_stmt(
+                tbl, tuple(unique_cols), tuple(df.columns), update_on_conflict)
 
             # Chunk the DataFrame for upsert to avoid large queries and network errors
-            upsert_chunksize = 1000  # Larger chunks for better performance
-            total_chunks = (len(df) + upsert_chunksize - 1) // upsert_chunksize
+            # Larger chunks for better performance, capped by column count
+            upsert_chunksize = _safe_chunksize(1000, len(df.columns))
+            chunk_starts = range(0, len(df), upsert_chunksize)
+            total_chunks = len(chunk_starts)
             logger.info("Processing upsert in %d chunks of size %d", total_chunks, upsert_chunksize)
 
-            for chunk_idx in range(total_chunks):
-                start_idx = chunk_idx * upsert_chunksize
-                end_idx = min((chunk_idx + 1) * upsert_chunksize, len(df))
-                chunk = df.iloc[start_idx:end_idx]
-
-                rows_sql = []
-                for _, row in chunk.iterrows():
-                    values = [_sql_literal(row[col]) for col in df.columns]
-                    rows_sql.append("(" + ", ".join(values) + ")")
-
-                if dialect_name == "sqlite":
-                    # SQLite: INSERT OR REPLACE with VALUES
-                    upsert_query = f"""
-                    INSERT OR REPLACE INTO {table_name} ({', '.join(quoted_columns)})
-                    VALUES {', '.join(rows_sql)}
-                    """
-                elif dialect_name == "mysql":
-                    # MySQL: ON DUPLICATE KEY UPDATE
-                    update_clause = ", ".join(
-                        [f"{quote_ident(col)} = VALUES({quote_ident(col)})" for col in non_unique_cols]
-                    )
-                    upsert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(quoted_columns)})
-                    VALUES {', '.join(rows_sql)}
-                    ON DUPLICATE KEY UPDATE {update_clause}
-                    """
-                elif dialect_name == "postgresql":
-                    # PostgreSQL: ON CONFLICT DO UPDATE
-                    update_clause = ", ".join(
-                        [f"{quote_ident(col)} = EXCLUDED.{quote_ident(col)}" for col in non_unique_cols]
-                    )
-                    upsert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(quoted_columns)})
-                    VALUES {', '.join(rows_sql)}
-                    ON CONFLICT ({', '.join(quoted_unique_cols)}) DO UPDATE SET {update_clause}
-                    """
-                else:
-                    # Fallback: create temp table, then upsert if supported by DB, else replace
+            staged = []
+            if stmt is None:
+                # No native upsert: stage each chunk in a temp table, then copy it across
+                quoted_columns = [f'"{col}"' for col in df.columns]
+                for chunk_idx, start in enumerate(chunk_starts):
                     temp_table_name = f"temp_{table_name}_{int(time.time())}_{chunk_idx}"
                     logger.info("Creating temp table '%s' for upsert chunk %d", temp_table_name, chunk_idx + 1)
                     temp_columns = []
@@ -514,7 +868,7 @@ class DBHelper:
                     temp_tbl = Table(temp_table_name, MetaData(), *temp_columns)
                     temp_tbl.create(self.engine, checkfirst=True)
 
-                    chunk.to_sql(
+                    df.iloc[start:start + upsert_chunksize].to_sql(
                         temp_table_name,
                         con=self.engine,
                         if_exists="append",
@@ -523,58 +877,89 @@ class DBHelper:
                         method="multi",
                     )
 
-                    upsert_query = f"""
+                    staged.append(text(f"""
                     INSERT INTO {table_name} ({', '.join(quoted_columns)})
                     SELECT {', '.join(quoted_columns)} FROM {temp_table_name}
-                    """
+                    """))
 
-                logger.debug("Upsert query for chunk %d: %s", chunk_idx + 1, upsert_query.strip())
+            def send_chunks(tx):
+                for chunk_idx, start in enumerate(chunk_starts):
+                    if stmt is None:
+                        tx.execute(staged[chunk_idx])
+                    else:
+                        tx.execute(
+                            stmt, _records(df.iloc[start:start + upsert_chunksize]))
+                    if chunk_idx % 5 == 0 or chunk_idx == total_chunks - 1:
+                        logger.info("Upsert chunk %d/%d sent to '%s' (%s)",
+                                    chunk_idx + 1, total_chunks, table_name, dialect_name)
+
+            if conn is not None:
+                # The caller owns the transaction (see transaction())
+                send_chunks(conn)
+            else:
                 max_retries = 5  # Increased retries for network resilience
                 retry_delay = 2.0
                 for attempt in range(max_retries):
                     try:
-                        with self.engine.begin() as conn:
-                            logger.info("Executing upsert query for chunk %d/%d...", chunk_idx + 1, total_chunks)
-                            conn.execute(text(upsert_query))
-                        logger.info("Upsert chunk %d/%d completed into '%s'", chunk_idx + 1, total_chunks, table_name)
+                        # All chunks share one transaction: a failure rolls the whole
+                        # upsert back (so a retry starts clean) and PostgreSQL
+                        # flushes WAL once at commit rather than once per chunk
+                        with self.engine.begin() as tx:
+                            if dialect_name == "postgresql":
+                                # Upserts are idempotent; a crash just means a rerun
+                                tx.exec_driver_sql("SET LOCAL synchronous_commit TO off")
+                            send_chunks(tx)
+                        logger.info("Upsert into '%s' committed", table_name)
                         break
                     except InterfaceError as e:
                         if attempt < max_retries - 1:
                             logger.warning(
-                                "Network error during upsert chunk %d/%d, retrying in %s seconds (attempt %d/%d): %s",
-                                chunk_idx + 1, total_chunks, retry_delay, attempt + 1, max_retries, e,
+                                "Network error during upsert, retrying in %s seconds (attempt %d/%d): %s",
+                                retry_delay, attempt + 1, max_retries, e,
                             )
                             time.sleep(retry_delay)
                             retry_delay = min(retry_delay * 2, 30.0)  # Exponential backoff with higher max delay
                         else:
                             logger.error(
-                                "Failed to upsert chunk %d/%d into '%s' after %d attempts due to network error: %s",
-                                chunk_idx + 1, total_chunks, table_name, max_retries, e, exc_info=True,
+                                "Failed to upsert into '%s' after %d attempts due to network error: %s",
+                                table_name, max_retries, e, exc_info=True,
                             )
                             raise
+        elif conn is None and self._adbc_uri() is not None:
+            logger.info(
+                "Appending DataFrame to '%s' (%d rows) via ADBC", table_name, len(df))
+            self._ingest_adbc(table_name, df)
         else:
             logger.info("Appending DataFrame to '%s' (%d rows)",
                         table_name, len(df))
-            # Use pandas to_sql for faster non-upsert inserts
-            logger.info(
-                "Starting pandas to_sql insert into '%s' with %d rows, chunksize %d",
-                table_name,
-                len(df),
-                chunksize,
-            )
+            # PostgreSQL streams the whole frame through COPY; other
+            # dialects fall back to pandas' multi-row INSERTs
+            use_copy = getattr(self.engine.dialect, "name", "") == "postgresql"
+            if not use_copy:
+                logger.info(
+                    "Starting pandas to_sql insert into '%s' with %d rows, chunksize %d",
+                    table_name,
+                    len(df),
+                    chunksize,
+                )
             non_upsert_start = time.time()
-            max_retries = 3
+            # A caller-owned transaction is already broken after a network
+            # error, so only retry when we manage the transaction ourselves
+            max_retries = 3 if conn is None else 1
             retry_delay = 2.0
             for attempt in range(max_retries):
                 try:
-                    df.to_sql(
-                        table_name,
-                        con=self.engine,
-                        if_exists="append",
-                        index=False,
-                        chunksize=chunksize,
-                        method="multi",
-                    )
+                    if use_copy:
+                        self._copy_append(table_name, df, conn)
+                    else:
+                        df.to_sql(
+                            table_name,
+                            con=self.engine if conn is None else conn,
+                            if_exists="append",
+                            index=False,
+                            chunksize=chunksize,
+                            method="multi",
+                        )
                     non_upsert_elapsed = time.time() - non_upsert_start
                     logger.info(
                         "Non-upsert insert into '%s' completed in %.2f seconds (%.1f rows/sec)",
@@ -619,6 +1004,14 @@ class DBHelper:
         if hasattr(self, "session") and self.session:
             self.session.close()
 
+        # Drop reflected schema so the Table/Column graph can be freed
+        if hasattr(self, "metadata"):
+            self.metadata.clear()
+            self._table_cache.clear()
+            self._col_cache.clear()
+            self._idx_cache.clear()
+            self._upsert_cache.clear()
+
         # Only dispose engine if we created it (custom URL case)
         if hasattr(self, "_own_engine") and self._own_engine and hasattr(self, "engine"):
             logger.info("Disposing custom database engine.")
@@ -0,0 +1,331 @@
+"""Flat-array helpers for per-ticker factor computations.
+
+``compute_factors`` sorts its frame by (Ticker, Date), so each ticker occupies
+one contiguous block of rows.  The helpers here work on the flat column arrays
+plus the block boundaries (``starts``: ``[s0, s1, ..., n]``), which avoids a
+Python-level call per ticker and never carries values across tickers.
+
+A wide (Date x Ticker) pivot is deliberately not used: tickers have ragged
+calendars (listings, suspensions), and positional lags such as
+``pct_change(21)`` must count a ticker's own rows, not calendar dates.
+
+When numba is installed the rolling statistics run as compiled single-pass
+kernels (running mean / sum of squared deviations, O(1) per row), with
+tickers processed in parallel.  Otherwise each ticker block goes through
+bottleneck's moving-window functions, or NumPy ``sliding_window_view`` when
+bottleneck is not installed either.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = prange = None
+    NUMBA_AVAILABLE = False
+
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    bn = None
+    BOTTLENECK_AVAILABLE = False
+
+
+def as_float_array(x) -> np.ndarray:
+    """Contiguous float32/float64 view of ``x`` (other dtypes become float64)."""
+    x = np.ascontiguousarray(x)
+    if x.dtype not in (np.float32, np.float64):
+        x = x.astype(np.float64)
+    return x
+
+
+def group_starts(keys) -> np.ndarray:
+    """Return block boundaries ``[s0, ..., n]`` for contiguous runs of ``keys``."""
+    keys = np.asarray(keys)
+    n = len(keys)
+    if n == 0:
+        return np.zeros(1, dtype=np.int64)
+    change = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    return np.concatenate(([0], change, [n])).astype(np.int64)
+
+
+def group_positions(starts: np.ndarray) -> np.ndarray:
+    """Offset of every row within its block (0 for the first row)."""
+    return np.arange(starts[-1]) - np.repeat(starts[:-1], np.diff(starts))
+
+
+def grouped_ffill(x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs within each block; leading NaNs stay NaN."""
+    n = len(x)
+    idx = np.where(np.isnan(x), -1, np.arange(n))
+    np.maximum.accumulate(idx, out=idx)
+    row_start = np.repeat(starts[:-1], np.diff(starts))
+    out = x[np.maximum(idx, 0)]
+    out[idx < row_start] = np.nan
+    return out
+
+
+def grouped_pct_change(x: np.ndarray, starts: np.ndarray, lag: int,
+                       positions: np.ndarray = None) -> np.ndarray:
+    """``x[i] / x[i - lag] - 1`` within each block, NaN for the first ``lag`` rows.
+
+    Matches ``Series.pct_change(lag)`` when ``x`` has already been passed
+    through :func:`grouped_ffill` (pandas' default ``fill_method='pad'``).
+    """
+    if positions is None:
+        positions = group_positions(starts)
+    out = np.full(len(x), np.nan)
+    if lag < len(x):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[lag:] = x[lag:] / x[:-lag] - 1.0
+    out[positions < lag] = np.nan
+    return out
+
+
+def compact(x: np.ndarray, starts: np.ndarray):
+    """Drop NaNs from ``x``.
+
+    Returns ``(values, compact_starts, mask)`` where ``compact_starts`` are the
+    block boundaries of ``values`` and ``mask`` marks the kept rows.
+    """
+    mask = ~np.isnan(x)
+    kept = np.concatenate(([0], np.cumsum(mask)))
+    return x[mask], kept[starts].astype(np.int64), mask
+
+
+def expand(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Inverse of :func:`compact`: scatter ``values`` back, NaN elsewhere."""
+    out = np.full(len(mask), np.nan)
+    out[mask] = values
+    return out
+
+
+def grouped_lag_diff(x: np.ndarray, starts: np.ndarray, lag: int,
+                     positions: np.ndarray = None) -> np.ndarray:
+    """``x[i] - x[i - lag]`` within each block, NaN for the first ``lag`` rows.
+
+    On log prices this gives log returns for any horizon from one ``np.log``
+    pass; ``np.expm1`` converts them back to simple returns.
+    """
+    if positions is None:
+        positions = group_positions(starts)
+    out = np.full(len(x), np.nan)
+    if lag < len(x):
+        np.subtract(x[lag:], x[:-lag], out=out[lag:])
+    out[positions < lag] = np.nan
+    return out
+
+
+def grouped_sma(x: np.ndarray, starts: np.ndarray, windows,
+                positions: np.ndarray = None) -> dict:
+    """Simple moving averages for several windows from one shared cumsum.
+
+    Only full windows without NaNs produce a value, as with
+    ``rolling(w, min_periods=w).mean()``.  Returns ``{window: array}``.
+    """
+    if positions is None:
+        positions = group_positions(starts)
+    valid = ~np.isnan(x)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0), dtype=np.float64)))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(x) + 1)
+    out = {}
+    for w in windows:
+        begin = np.maximum(end - w, 0)
+        sma = (csum[end] - csum[begin]) / w
+        sma[(positions < w - 1) | (ccount[end] - ccount[begin] < w)] = np.nan
+        out[w] = sma
+    return out
+
+
+def _window_moments(segment: np.ndarray, window: int, min_periods: int, ddof: int):
+    """Rolling (mean, std) of one block via strided windows (NumPy only)."""
+    padded = np.concatenate((np.full(window - 1, np.nan), segment))
+    windows = sliding_window_view(padded, window)
+    valid = ~np.isnan(windows)
+    count = valid.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, windows, 0.0).sum(axis=1) / count
+        dev = np.where(valid, windows - mean[:, None], 0.0)
+        var = (dev * dev).sum(axis=1) / (count - ddof)
+    std = np.sqrt(var)
+    mean[count < min_periods] = np.nan
+    std[(count < min_periods) | (count <= ddof)] = np.nan
+    return mean, std
+
+
+def _rolling_moments_blockwise(x: np.ndarray, starts: np.ndarray, window: int,
+                               min_periods: int, ddof: int):
+    """Per-block rolling (mean, std) without numba."""
+    out_mean = np.full(len(x), np.nan)
+    out_std = np.full(len(x), np.nan)
+    for lo, hi in zip(starts[:-1], starts[1:]):
+        if hi - lo < min_periods:
+            continue  # too short for any valid window
+        segment = x[lo:hi].astype(np.float64)
+        if BOTTLENECK_AVAILABLE:
+            # Windows never reach past the block start, so capping at its length is exact
+            w = min(window, hi - lo)
+            out_mean[lo:hi] = bn.move_mean(segment, w, min_count=min_periods)
+            out_std[lo:hi] = bn.move_std(segment, w, min_count=min(max(min_periods, ddof + 1), w),
+                                         ddof=ddof)
+        else:
+            out_mean[lo:hi], out_std[lo:hi] = _window_moments(
+                segment, window, min_periods, ddof)
+    return out_mean, out_std
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, nogil=True, cache=True)
+    def _rolling_moments(x, starts, window, min_periods, ddof, out_mean, out_std):
+        """Welford add/remove over each block; NaNs are skipped like pandas."""
+        for g in prange(len(starts) - 1):
+            lo = starts[g]
+            hi = starts[g + 1]
+            nobs = 0
+            mean = 0.0
+            ssqdm = 0.0
+            for i in range(lo, hi):
+                val = x[i]
+                if val == val:
+                    nobs += 1
+                    delta = val - mean
+                    mean += delta / nobs
+                    ssqdm += ((nobs - 1) * delta * delta) / nobs
+                j = i - window
+                if j >= lo:
+                    old = x[j]
+                    if old == old:
+                        nobs -= 1
+                        if nobs > 0:
+                            delta = old - mean
+                            mean -= delta / nobs
+                            ssqdm -= ((nobs + 1) * delta * delta) / nobs
+                        else:
+                            mean = 0.0
+                            ssqdm = 0.0
+                if nobs >= min_periods and nobs > 0:
+                    out_mean[i] = mean
+                    if nobs > ddof:
+                        var = 0.0 if nobs == 1 else ssqdm / (nobs - ddof)
+                        out_std[i] = np.sqrt(var) if var > 0.0 else 0.0
+                    else:
+                        out_std[i] = np.nan
+                else:
+                    out_mean[i] = np.nan
+                    out_std[i] = np.nan
+
+    @njit(parallel=True, nogil=True, cache=True)
+    def _macd_kernel(x, starts, fast, slow, signal, out_macd, out_hist):
+        """Fast/slow/signal EMAs (``adjust=False``) fused into one pass per block."""
+        a_f = 2.0 / (fast + 1)
+        a_s = 2.0 / (slow + 1)
+        a_g = 2.0 / (signal + 1)
+        for g in prange(len(starts) - 1):
+            lo = starts[g]
+            hi = starts[g + 1]
+            for i in range(lo, hi):
+                out_macd[i] = np.nan
+                out_hist[i] = np.nan
+            if hi - lo < slow:
+                continue
+            ema_f = x[lo]
+            ema_s = x[lo]
+            sig = 0.0
+            for k in range(hi - lo):
+                i = lo + k
+                if k > 0:
+                    ema_f = (1.0 - a_f) * ema_f + a_f * x[i]
+                    ema_s = (1.0 - a_s) * ema_s + a_s * x[i]
+                if k >= slow - 1:
+                    m = ema_f - ema_s
+                    if k == slow - 1:
+                        sig = m
+                    else:
+                        sig = (1.0 - a_g) * sig + a_g * m
+                    out_macd[i] = m
+                    if k >= slow + signal - 2:
+                        out_hist[i] = m - sig
+
+    @njit(parallel=True, nogil=True, cache=True)
+    def _rsi_kernel(x, starts, period, out):
+        """Wilder RSI per block, seeded like ``ta.momentum.rsi`` (EWM with
+        ``alpha=1/period, adjust=False`` from the first diff, which counts
+        as zero; missing diffs count as zero gain and loss)."""
+        a = 1.0 / period
+        for g in prange(len(starts) - 1):
+            lo = starts[g]
+            hi = starts[g + 1]
+            avg_up = 0.0
+            avg_dn = 0.0
+            for k in range(hi - lo):
+                i = lo + k
+                up = 0.0
+                dn = 0.0
+                if k > 0:
+                    d = x[i] - x[i - 1]
+                    if d > 0:
+                        up = d
+                    elif d < 0:
+                        dn = -d
+                    avg_up = (1.0 - a) * avg_up + a * up
+                    avg_dn = (1.0 - a) * avg_dn + a * dn
+                if k < period - 1:
+                    out[i] = np.nan
+                elif avg_dn == 0.0:
+                    out[i] = 100.0
+                else:
+                    out[i] = 100.0 - 100.0 / (1.0 + avg_up / avg_dn)
+
+
+def rsi_grouped(close: np.ndarray, starts: np.ndarray, period: int = 14) -> np.ndarray:
+    """Per-block RSI matching ``ta.momentum.rsi(close, window=period)``.
+
+    Requires numba.
+    """
+    out = np.empty(len(close))
+    _rsi_kernel(as_float_array(close), starts, period, out)
+    return out
+
+
+def macd_grouped(close: np.ndarray, starts: np.ndarray, fast: int = 12,
+                 slow: int = 26, signal: int = 9):
+    """Per-block ``(MACD, MACD histogram)`` matching ``ta.trend.MACD`` on the
+    NaN-dropped series; tickers with fewer than ``slow`` prices are all NaN.
+
+    Requires numba.
+    """
+    values, cstarts, mask = compact(as_float_array(close), starts)
+    out_macd = np.empty(len(values))
+    out_hist = np.empty(len(values))
+    _macd_kernel(values, cstarts, fast, slow, signal, out_macd, out_hist)
+    return expand(out_macd, mask), expand(out_hist, mask)
+
+
+def rolling_mean_std_grouped(x: np.ndarray, starts: np.ndarray, window: int,
+                             min_periods: int, ddof: int = 1):
+    """Per-block rolling ``(mean, std)`` in one pass over ``x``."""
+    x = as_float_array(x)
+    if not NUMBA_AVAILABLE:
+        return _rolling_moments_blockwise(x, starts, window, max(min_periods, 1), ddof)
+    # float32 input is accumulated and returned in float64
+    out_mean = np.empty(len(x))
+    out_std = np.empty(len(x))
+    _rolling_moments(x, starts, window, max(min_periods, 1), ddof, out_mean, out_std)
+    return out_mean, out_std
+
+
+def rolling_mean_grouped(x: np.ndarray, starts: np.ndarray, window: int,
+                         min_periods: int) -> np.ndarray:
+    """Per-block rolling mean (NaN-skipping)."""
+    return rolling_mean_std_grouped(x, starts, window, min_periods)[0]
+
+
+def rolling_std_grouped(x: np.ndarray, starts: np.ndarray, window: int,
+                        min_periods: int, ddof: int = 1) -> np.ndarray:
+    """Per-block rolling standard deviation (NaN-skipping)."""
+    return rolling_mean_std_grouped(x, starts, window, min_periods, ddof)[1]
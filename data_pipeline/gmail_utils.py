@@ -32,7 +32,7 @@ warnings.filterwarnings("ignore", message=".*ALTS creds ignored.*")
 SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
 
 # Gmail authentication configuration
-USE_SECRET_MANAGER = os.environ.get("USE_GCP_SECRET_MANAGER", "true").lower() == "true"
+USE_SECRET_MANAGER = config.USE_GCP_SECRET_MANAGER
 
 def _get_secret_from_manager(secret_name: str) -> Optional[str]:
     """Get secret from Google Cloud Secret Manager."""
@@ -60,7 +60,8 @@ def _save_oauth_token_to_secret_manager(token_json: str) -> bool:
         return False
     
     try:
-        client = secretmanager.SecretManagerServiceClient()
+        from data_pipeline.utils import get_secret_client
+        client = get_secret_client()
         parent = f"projects/{config.GCP_PROJECT_ID}"
         secret_id = "GMAIL_OAUTH_TOKEN"
         
@@ -112,7 +113,8 @@ def _get_credentials_path():
     if secret_name and secretmanager:
         logger.info("Fetching Gmail credentials from Secret Manager.")
         try:
-            client = secretmanager.SecretManagerServiceClient()
+            from data_pipeline.utils import get_secret_client
+            client = get_secret_client()
             name = f"projects/{config.GCP_PROJECT_ID}/secrets/{secret_name}/versions/latest"
             response = client.access_secret_version(request={"name": name})
             payload = response.payload.data.decode("UTF-8")
@@ -175,7 +177,8 @@ def get_gmail_service(
     if secret_name and secretmanager:
         logger.info("Fetching Service Account key from Secret Manager for Gmail.")
         try:
-            client = secretmanager.SecretManagerServiceClient()
+            from data_pipeline.utils import get_secret_client
+            client = get_secret_client()
             name = f"projects/{config.GCP_PROJECT_ID}/secrets/{secret_name}/versions/latest"
             response = client.access_secret_version(request={"name": name})
             key_data = response.payload.data.decode("UTF-8")
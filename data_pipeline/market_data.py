@@ -87,12 +87,18 @@ def ensure_directories(dirs=None):
 try:
     from .cache_utils import \
         load_cached_fundamentals as _load_cached_fundamentals
+    from .cache_utils import \
+        load_many_cached_fundamentals as _load_many_cached_fundamentals
     from .cache_utils import \
         save_fundamentals_cache as _save_fundamentals_cache
+    from .cache_utils import save_many_async as _save_many_async
 except ImportError:  # pragma: no cover - fallback for script execution
     from cache_utils import \
         load_cached_fundamentals as _load_cached_fundamentals  # type: ignore
+    from cache_utils import \
+        load_many_cached_fundamentals as _load_many_cached_fundamentals  # type: ignore
     from cache_utils import save_fundamentals_cache as _save_fundamentals_cache
+    from cache_utils import save_many_async as _save_many_async  # type: ignore
 
 
 def load_cached_fundamentals(
@@ -113,6 +119,24 @@ def save_fundamentals_cache(ticker: str, data: dict) -> None:
         logger.warning(f"Failed to save cache for {ticker}: {e}")
 
 
+def load_many_cached_fundamentals(
+    tickers: list[str],
+    expiry_minutes: int = config.CACHE_EXPIRY_MINUTES,
+) -> dict[str, Optional[dict]]:
+    try:
+        return _load_many_cached_fundamentals(tickers, expiry_minutes=expiry_minutes)
+    except Exception as e:  # pragma: no cover - best effort logging
+        logger.warning(f"Batched cache load failed, loading sequentially: {e}")
+        return {t: load_cached_fundamentals(t, expiry_minutes) for t in tickers}
+
+
+async def save_many_fundamentals_cache(items: dict[str, dict]) -> None:
+    try:
+        await _save_many_async(items)
+    except Exception as e:  # pragma: no cover - best effort logging
+        logger.warning(f"Failed to save cache for {len(items)} tickers: {e}")
+
+
 def fetch_macro_data(start_date: str, end_date: str) -> Optional[pd.DataFrame]:
     """Fetch macroeconomic indicators for the given date range.
 
@@ -394,9 +418,10 @@ def fetch_fundamental_data(
     results: list[dict] = []
     remaining: list[str] = []
     if use_cache:
+        cached_map = load_many_cached_fundamentals(
+            list(ticker_symbols), expiry_minutes=cache_expiry_minutes)
         for symbol in ticker_symbols:
-            cached = load_cached_fundamentals(
-                symbol, expiry_minutes=cache_expiry_minutes)
+            cached = cached_map.get(symbol)
             if cached is not None:
                 logger.info(f"Loaded cached fundamentals for {symbol}")
                 results.append(cached)
@@ -476,6 +501,7 @@ def fetch_fundamental_data(
                     info = {}
                 fetched.append((t, info))
 
+        to_cache: dict[str, dict] = {}
         for symbol, info in fetched:
             if not info:
                 logger.error(
@@ -502,8 +528,10 @@ def fetch_fundamental_data(
                 "averageVolume": info.get("averageVolume"),
             }
             results.append(key_ratios)
-            if use_cache:
-                save_fundamentals_cache(symbol, key_ratios)
+            to_cache[symbol] = key_ratios
+
+        if use_cache and to_cache:
+            await save_many_fundamentals_cache(to_cache)
 
         logger.debug("Fundamental data fetch completed.")
         return results
@@ -583,7 +611,7 @@ def main(engine, start_date, end_date):
         ensure_directories()
 
         logger.info("Fetching market data...")
-        tickers = config.FTSE_100_TICKERS
+        tickers = list(config.FTSE_100_TICKERS)
 
         # Example usage of the engine
         try:
@@ -3,15 +3,37 @@ import logging
 import os
 import json
 import tempfile
-
-# third-party libraries
-from google.cloud import secretmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # local application imports
 import data_pipeline.config as config
 
 logger = logging.getLogger(__name__)
 
+# google-cloud-secretmanager is imported on first use; see _get_secretmanager
+_secretmanager = None
+
+
+def _get_secretmanager():
+    """Import and cache the Secret Manager client module on first use."""
+    global _secretmanager
+    if _secretmanager is None:
+        from google.cloud import secretmanager
+
+        _secretmanager = secretmanager
+    return _secretmanager
+
+
+@lru_cache(maxsize=1)
+def get_secret_client():
+    """Return a process-wide Secret Manager client.
+
+    The client holds a gRPC channel, so reusing it avoids a new connection
+    and auth handshake per secret lookup.
+    """
+    return _get_secretmanager().SecretManagerServiceClient()
+
 
 def _setup_gcp_credentials():
     """Set up GCP credentials for different environments."""
@@ -59,7 +81,7 @@ def _setup_gcp_credentials():
 def get_secret(secret_name: str) -> str:
     """Fetch a secret value from Google Cloud Secret Manager, with fallback to environment variables."""
     # Check if GCP Secret Manager is enabled
-    use_secret_manager = os.environ.get("USE_GCP_SECRET_MANAGER", "true").lower() == "true"
+    use_secret_manager = config.USE_GCP_SECRET_MANAGER
 
     # First, try to get from environment variable (for local development)
     env_value = os.environ.get(secret_name)
@@ -73,7 +95,7 @@ def get_secret(secret_name: str) -> str:
         _setup_gcp_credentials()
 
         try:
-            client = secretmanager.SecretManagerServiceClient()
+            client = get_secret_client()
             project_id = config.GCP_PROJECT_ID  # Fetch project_id from config
             logger.debug(f"Using project_id: {project_id}")
             name = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
@@ -94,3 +116,25 @@ def get_secret(secret_name: str) -> str:
     else:
         logger.info(f"GCP Secret Manager not enabled, but {secret_name} not found in environment variables")
         raise RuntimeError(f"Secret {secret_name} not found in environment variables")
+
+
+def get_secrets_bulk(secret_names: list[str]) -> dict[str, str]:
+    """Fetch several secrets at once, querying Secret Manager concurrently.
+
+    Environment variables take precedence as in :func:`get_secret`; the
+    remaining names are fetched in parallel over the shared client, so the
+    wall-clock cost is roughly one round-trip instead of one per secret.
+    Raises ``RuntimeError`` if any secret cannot be resolved.
+    """
+    names = list(dict.fromkeys(secret_names))
+    secrets = {name: os.environ[name] for name in names if os.environ.get(name)}
+    missing = [name for name in names if name not in secrets]
+    if not missing:
+        return secrets
+
+    if config.USE_GCP_SECRET_MANAGER:
+        # Resolve credentials once rather than racing in every worker
+        _setup_gcp_credentials()
+    with ThreadPoolExecutor(max_workers=min(len(missing), 8)) as pool:
+        secrets.update(zip(missing, pool.map(get_secret, missing)))
+    return secrets
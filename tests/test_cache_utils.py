@@ -0,0 +1,37 @@
+import asyncio
+
+from data_pipeline import cache_utils
+
+
+def test_bulk_save_and_load_in_memory(monkeypatch):
+    monkeypatch.setattr(cache_utils.config, "CACHE_GCS_BUCKET", None, raising=False)
+    monkeypatch.setattr(cache_utils, "_CACHE", {})
+
+    items = {"AAA.L": {"Ticker": "AAA.L"}, "BBB.L": {"Ticker": "BBB.L"}}
+    asyncio.run(cache_utils.save_many_async(items))
+
+    loaded = cache_utils.load_many_cached_fundamentals(
+        ["AAA.L", "BBB.L", "CCC.L"], expiry_minutes=60)
+    assert loaded == {"AAA.L": items["AAA.L"], "BBB.L": items["BBB.L"], "CCC.L": None}
+    # Single-ticker API sees the same entries
+    assert cache_utils.load_cached_fundamentals("AAA.L") == items["AAA.L"]
+
+
+def test_bulk_load_respects_expiry(monkeypatch):
+    monkeypatch.setattr(cache_utils.config, "CACHE_GCS_BUCKET", None, raising=False)
+    monkeypatch.setattr(cache_utils, "_CACHE", {
+        "OLD.L": {"data": {"Ticker": "OLD.L"}, "timestamp": "2000-01-01T00:00:00"},
+    })
+
+    assert cache_utils.load_many_cached_fundamentals(["OLD.L"], expiry_minutes=60) == {"OLD.L": None}
+
+
+def test_memory_backend_skips_gcs(monkeypatch):
+    monkeypatch.setattr(cache_utils.config, "CACHE_BACKEND", "memory", raising=False)
+    monkeypatch.setattr(cache_utils, "_CACHE", {})
+    monkeypatch.setattr(cache_utils, "_client", None)
+
+    cache_utils.save_fundamentals_cache("AAA.L", {"Ticker": "AAA.L"})
+
+    assert cache_utils.load_cached_fundamentals("AAA.L") == {"Ticker": "AAA.L"}
+    assert cache_utils._client is None
@@ -0,0 +1,81 @@
+import os
+import shutil
+import subprocess
+import sys
+
+
+def test_config_import_skips_heavy_clients():
+    code = (
+        "import sys, data_pipeline.config, data_pipeline.utils\n"
+        "heavy = [m for m in ('streamlit', 'google.cloud.secretmanager') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_ftse_tickers_are_frozen():
+    from data_pipeline import config
+
+    assert isinstance(config.FTSE_100_TICKERS, tuple)
+    assert config.FTSE_100_TICKERS_SET == frozenset(config.FTSE_100_TICKERS)
+    assert len(config.FTSE_100_TICKERS_SET) == len(config.FTSE_100_TICKERS)
+
+
+def test_ensure_dir_fallbacks_share_one_root(monkeypatch, tmp_path):
+    from data_pipeline import config
+
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setattr(config, "_FALLBACK_ROOT", None)
+    monkeypatch.setenv("DATA_DIR", str(blocker / "data"))
+    monkeypatch.setenv("LOG_DIR", str(blocker / "logs"))
+
+    data_dir = config._ensure_dir("DATA_DIR", "unused")
+    log_dir = config._ensure_dir("LOG_DIR", "unused")
+
+    assert os.path.dirname(data_dir) == os.path.dirname(log_dir) == config._FALLBACK_ROOT
+    assert os.path.isdir(data_dir) and os.path.isdir(log_dir)
+    shutil.rmtree(config._FALLBACK_ROOT)
+
+
+def test_ensure_dir_trusts_existing_env_dir(monkeypatch, tmp_path):
+    from data_pipeline import config
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("makedirs should not be called")
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config.os, "makedirs", _fail)
+
+    assert config._ensure_dir("DATA_DIR", "unused") == str(tmp_path)
+
+
+def test_ensure_dir_follows_env_changes_and_recreates(monkeypatch, tmp_path):
+    from data_pipeline import config
+
+    first, second = tmp_path / "a", tmp_path / "b"
+    monkeypatch.setenv("DATA_DIR", str(first))
+    assert config._ensure_dir("DATA_DIR", "unused") == str(first)
+    first.rmdir()
+    assert config._ensure_dir("DATA_DIR", "unused") == str(first)
+    assert first.is_dir()
+    monkeypatch.setenv("DATA_DIR", str(second))
+    assert config._ensure_dir("DATA_DIR", "unused") == str(second)
+
+
+def test_file_logger_attaches_each_log_file_once(monkeypatch, tmp_path):
+    from data_pipeline import config
+
+    monkeypatch.setattr(config, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "_LOGGER_FILES", {})
+    name = "eqae_test_file_logger"
+    logger = config.get_file_logger(name)
+    try:
+        config.get_file_logger(name)
+        assert len(logger.handlers) == 1
+        config.get_file_logger(name, "other.log")
+        assert len(logger.handlers) == 2
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
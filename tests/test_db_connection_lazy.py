@@ -0,0 +1,98 @@
+from unittest.mock import MagicMock
+
+from sqlalchemy import text
+
+from data_pipeline import db_connection
+
+
+def test_import_does_not_connect():
+    # Importing the module must not build the Cloud SQL connector
+    assert db_connection._connector is None
+
+
+def test_get_engine_for_explicit_url_is_cached(tmp_path):
+    url = f"sqlite:///{tmp_path / 'lazy.db'}"
+    engine = db_connection.get_engine(url)
+    try:
+        assert db_connection.get_engine(url) is engine
+        assert db_connection._engine is not engine
+    finally:
+        engine.dispose()
+        db_connection._engine_for_url.cache_clear()
+
+
+def test_reinitialize_swaps_and_disposes_engine(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_connection, "_engine", None)
+    monkeypatch.setattr(db_connection, "_SessionLocal", None)
+    db_connection.reinitialize_engine(f"sqlite:///{tmp_path / 'a.db'}")
+    first = db_connection.get_engine()
+    disposed = []
+    monkeypatch.setattr(first, "dispose", lambda: disposed.append(True))
+
+    db_connection.reinitialize_engine(f"sqlite:///{tmp_path / 'b.db'}")
+
+    assert db_connection.get_engine() is not first
+    assert db_connection.get_session_local().kw["bind"] is db_connection.get_engine()
+    assert disposed == [True]
+    db_connection.get_engine().dispose()
+
+
+def test_parse_database_url_is_frozen_and_cached():
+    url = "postgresql+pg8000://user:pw@34.1.2.3:5432/equity"
+    parsed = db_connection._parse_database_url(url)
+
+    assert (parsed.driver, parsed.user, parsed.host, parsed.port, parsed.database) == (
+        "pg8000", "user", "34.1.2.3", 5432, "equity")
+    assert db_connection._parse_database_url(url) is parsed
+
+
+def test_thread_session_is_reused_and_session_scope_rolls_back(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_connection, "_engine", None)
+    monkeypatch.setattr(db_connection, "_SessionLocal", None)
+    monkeypatch.setattr(db_connection, "_ScopedSession", None)
+    db_connection.reinitialize_engine(f"sqlite:///{tmp_path / 's.db'}")
+
+    assert db_connection.get_thread_session() is db_connection.get_thread_session()
+
+    with db_connection.session_scope() as db:
+        db.execute(text("CREATE TABLE t (x INTEGER)"))
+        db.execute(text("INSERT INTO t VALUES (1)"))
+    try:
+        with db_connection.session_scope() as db:
+            db.execute(text("INSERT INTO t VALUES (2)"))
+            raise ValueError
+    except ValueError:
+        pass
+    with db_connection.session_scope() as db:
+        assert db.execute(text("SELECT count(*) FROM t")).scalar() == 1
+
+    db_connection.get_scoped_session().remove()
+    db_connection.get_engine().dispose()
+
+
+def test_make_getconn_passes_ip_type_and_iam(monkeypatch):
+    connector = MagicMock()
+    monkeypatch.setattr(db_connection, "_connector", connector)
+    monkeypatch.setenv("PRIVATE_IP", "1")
+    monkeypatch.setenv("IAM_AUTH", "1")
+    parsed = db_connection._parse_database_url(
+        "postgresql+pg8000://svc@10.0.0.5:5432/equity")
+
+    db_connection._make_getconn("proj:region:inst", parsed)()
+
+    kwargs = connector.connect.call_args.kwargs
+    assert kwargs["ip_type"] == db_connection.IPTypes.PRIVATE
+    assert kwargs["enable_iam_auth"] is True
+    assert "password" not in kwargs
+
+
+def test_connect_args_set_server_timeouts():
+    psycopg = db_connection._get_driver_specific_connect_args(
+        "postgresql+psycopg2://u:p@h/db")
+    assert "-c statement_timeout=" in psycopg["options"]
+    assert psycopg["keepalives"] == 1
+
+    pg8000 = db_connection._get_driver_specific_connect_args(
+        "postgresql+pg8000://u:p@h/db")
+    assert pg8000["startup_params"] is db_connection.SERVER_SETTINGS
+    assert "connect_timeout" not in pg8000
@@ -1,13 +1,18 @@
+import datetime
 import unittest
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
-from sqlalchemy import Column, Float, MetaData, Table
+from sqlalchemy import BigInteger, Column, Float, MetaData, Table
 from sqlalchemy import Text as SAText
 from sqlalchemy import inspect, text
 from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.exc import DBAPIError, IntegrityError
 
-from data_pipeline.db_utils import DBHelper
+from data_pipeline.db_utils import (_PG_PROBE_SQL, DBHelper,
+                                    _coerce_int_columns, _copy_csv,
+                                    _engine_kwargs, _records,
+                                    _sa_type_for_series, _safe_chunksize)
 
 
 class TestDBHelperSQLInjection(unittest.TestCase):
@@ -80,6 +85,137 @@ class TestInsertDialect(unittest.TestCase):
         self.assertIn("ON CONFLICT", compiled)
         helper.close()
 
+    def test_postgresql_insert_without_update(self):
+        helper, conn = self._prepare_helper(postgresql.dialect())
+        helper.insert_dataframe("test_tbl", self.df, unique_cols=["Ticker"],
+                                update_on_conflict=False)
+        stmt = conn.execute.call_args[0][0]
+        compiled = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn("ON CONFLICT (\"Ticker\") DO NOTHING", compiled)
+        helper.close()
+
+    def test_large_postgresql_upsert_uses_copy(self):
+        helper, conn = self._prepare_helper(postgresql.dialect())
+        cursor = MagicMock(spec=["execute"])
+        raw = MagicMock()
+        raw.cursor.return_value = cursor
+        helper.engine.raw_connection = MagicMock(return_value=raw)
+
+        with patch("data_pipeline.db_utils.COPY_UPSERT_MIN_ROWS", 2):
+            helper.insert_dataframe("test_tbl", self.df, unique_cols=["Ticker"])
+
+        conn.execute.assert_not_called()
+        sqls = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertTrue(sqls[0].startswith("CREATE TEMP TABLE"))
+        self.assertIn("FROM STDIN", sqls[1])
+        self.assertEqual(
+            cursor.execute.call_args_list[1].kwargs["stream"].getvalue(),
+            "A.L,100,1000\nB.L,200,1500\n",
+        )
+        self.assertIn('ON CONFLICT ("Ticker") DO UPDATE', sqls[2])
+        raw.commit.assert_called_once()
+        helper.close()
+
+    def test_copy_upsert_writes_nan_promoted_ints_as_integers(self):
+        helper, conn = self._prepare_helper(postgresql.dialect())
+        helper._table = MagicMock(return_value=Table(
+            "int_tbl", MetaData(),
+            Column("Ticker", SAText, primary_key=True),
+            Column("Volume", BigInteger),
+        ))
+        cursor = MagicMock(spec=["execute"])
+        raw = MagicMock()
+        raw.cursor.return_value = cursor
+        helper.engine.raw_connection = MagicMock(return_value=raw)
+        df = pd.DataFrame({"Ticker": ["A.L", "B.L"], "Volume": [1000, None]})
+        self.assertEqual(df["Volume"].dtype.kind, "f")
+
+        with patch("data_pipeline.db_utils.COPY_UPSERT_MIN_ROWS", 2):
+            helper.insert_dataframe("int_tbl", df, unique_cols=["Ticker"])
+
+        self.assertEqual(
+            cursor.execute.call_args_list[1].kwargs["stream"].getvalue(),
+            "A.L,1000\nB.L,\\N\n",
+        )
+        helper.close()
+
+    def test_very_large_postgresql_upsert_copies_in_parallel(self):
+        helper, conn = self._prepare_helper(postgresql.dialect())
+        helper.engine.raw_connection = MagicMock(
+            side_effect=lambda: MagicMock(cursor=MagicMock(
+                return_value=MagicMock(spec=["execute"]))))
+
+        with patch("data_pipeline.db_utils.COPY_UPSERT_MIN_ROWS", 1), \
+                patch("data_pipeline.db_utils.COPY_UPSERT_WORKERS", 2):
+            helper.insert_dataframe("test_tbl", self.df, unique_cols=["Ticker"])
+
+        self.assertEqual(helper.engine.raw_connection.call_count, 2)
+        sqls = [c.args[0] for c in conn.exec_driver_sql.call_args_list]
+        self.assertEqual(sqls[0].count("UNION ALL"), 1)
+        self.assertIn('ON CONFLICT ("Ticker") DO UPDATE', sqls[0])
+        self.assertTrue(all(q.startswith("DROP TABLE IF EXISTS") for q in sqls[1:]))
+        self.assertEqual(len(sqls), 3)
+        helper.close()
+
+    def test_append_uses_adbc_for_postgresql_url(self):
+        helper = DBHelper("sqlite://")
+        self.addCleanup(helper.close)
+        helper.database_url = "postgresql+pg8000://user:pw@db.local:5432/equity"
+        helper._table = MagicMock()
+        with patch("data_pipeline.db_utils.ADBC_AVAILABLE", True), \
+                patch.object(helper, "_ingest_adbc") as ingest:
+            self.assertEqual(helper._adbc_uri(),
+                             "postgresql://user:pw@db.local:5432/equity")
+            helper.insert_dataframe("test_tbl", self.df)
+        ingest.assert_called_once()
+
+    def test_postgresql_append_uses_copy(self):
+        helper, conn = self._prepare_helper(postgresql.dialect())
+        cursor = MagicMock(spec=["execute"])
+        raw = MagicMock()
+        raw.cursor.return_value = cursor
+        helper.engine.raw_connection = MagicMock(return_value=raw)
+
+        helper.insert_dataframe("test_tbl", self.df)
+
+        conn.execute.assert_not_called()
+        copy_call = cursor.execute.call_args
+        self.assertEqual(
+            copy_call.args[0],
+            'COPY test_tbl ("Ticker", "Close", "Volume") FROM STDIN '
+            "WITH (FORMAT csv, NULL '\\N')",
+        )
+        self.assertEqual(copy_call.kwargs["stream"].getvalue(),
+                         "A.L,100,1000\nB.L,200,1500\n")
+        raw.commit.assert_called_once()
+        raw.close.assert_called_once()
+        helper.close()
+
+    def test_postgresql_append_writes_nan_promoted_ints_as_integers(self):
+        helper, conn = self._prepare_helper(postgresql.dialect())
+        helper._table = MagicMock(return_value=Table(
+            "int_tbl", MetaData(), Column("Volume", BigInteger)))
+        cursor = MagicMock(spec=["execute"])
+        raw = MagicMock()
+        raw.cursor.return_value = cursor
+        helper.engine.raw_connection = MagicMock(return_value=raw)
+
+        helper.insert_dataframe("int_tbl", pd.DataFrame({"Volume": [1500, None]}))
+
+        self.assertEqual(cursor.execute.call_args.kwargs["stream"].getvalue(),
+                         "1500\n\\N\n")
+        helper.close()
+
+    def test_postgresql_upsert_runs_in_one_transaction(self):
+        helper, conn = self._prepare_helper(postgresql.dialect())
+        with patch("data_pipeline.db_utils._safe_chunksize", return_value=1):
+            helper.insert_dataframe("test_tbl", self.df, unique_cols=["Ticker"])
+        helper.engine.begin.assert_called_once()
+        conn.exec_driver_sql.assert_called_once_with(
+            "SET LOCAL synchronous_commit TO off")
+        self.assertEqual(conn.execute.call_count, 2)
+        helper.close()
+
     def test_mysql_insert_clause(self):
         helper, conn = self._prepare_helper(mysql.dialect())
         helper.insert_dataframe("test_tbl", self.df, unique_cols=["Ticker"])
@@ -87,3 +223,326 @@ class TestInsertDialect(unittest.TestCase):
         compiled = str(stmt.compile(dialect=mysql.dialect()))
         self.assertIn("ON DUPLICATE KEY UPDATE", compiled)
         helper.close()
+
+
+class TestTableReflectionCache(unittest.TestCase):
+    def setUp(self):
+        self.db = DBHelper("sqlite://")
+        with self.db.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE cached_tbl (id INTEGER)"))
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_table_reflected_once(self):
+        first = self.db._table("cached_tbl")
+        self.assertIs(self.db._table("cached_tbl"), first)
+
+    def test_create_table_reuses_cached_columns(self):
+        df = pd.DataFrame({"id": [1]})
+        self.db.create_table("cached_tbl", df, auto_populate=False)
+        with patch.object(self.db.inspector, "get_columns") as get_columns:
+            self.db.create_table("cached_tbl", df, auto_populate=False)
+        get_columns.assert_not_called()
+
+    def test_added_column_refreshes_cache(self):
+        self.db.create_table("cached_tbl", pd.DataFrame({"id": [1]}),
+                             auto_populate=False)
+        self.db.create_table(
+            "cached_tbl", pd.DataFrame({"id": [1], "v": [1.0], "w": ["x"]}),
+            auto_populate=False)
+        self.assertEqual(self.db._columns("cached_tbl"), {"id", "v", "w"})
+        self.assertIn("v", self.db._table("cached_tbl").c)
+
+    def test_create_table_leaves_session_untouched(self):
+        with patch.object(self.db.session, "close") as close, \
+                patch.object(self.db.session, "begin") as begin:
+            self.db.create_table("new_tbl", pd.DataFrame({"id": [1]}),
+                                 auto_populate=False)
+        begin.assert_not_called()
+        close.assert_not_called()
+        self.assertEqual(self.db._columns("new_tbl"), {"id"})
+
+    def test_missing_columns_added_in_one_statement(self):
+        df = pd.DataFrame({"id": [1], "a": [1.0], "b": ["x"]})
+        self.db.engine.dialect = postgresql.dialect()
+        stmts = self.db._add_columns_ddl("cached_tbl", df, ["a", "b"])
+        self.assertEqual(
+            [str(s) for s in stmts],
+            ['ALTER TABLE "cached_tbl" ADD COLUMN IF NOT EXISTS "a" FLOAT, '
+             'ADD COLUMN IF NOT EXISTS "b" TEXT'],
+        )
+
+    def test_upsert_statement_is_reused(self):
+        df = pd.DataFrame({"id": [1]})
+        self.db.create_table("up_tbl", df, unique_cols=["id"], auto_populate=False)
+        self.assertIn("uq_up_tbl_id", self.db._index_names("up_tbl"))
+        tbl = self.db._table("up_tbl")
+        stmt = self.db._upsert_stmt(tbl, ("id",), ("id",))
+        self.assertIs(self.db._upsert_stmt(tbl, ("id",), ("id",)), stmt)
+
+        self.db.insert_dataframe("up_tbl", df, unique_cols=["id"])
+        self.db.insert_dataframe("up_tbl", df, unique_cols=["id"])
+        with self.db.engine.connect() as conn:
+            self.assertEqual(
+                conn.execute(text("SELECT count(*) FROM up_tbl")).scalar(), 1)
+
+    def test_insert_without_update_keeps_existing_rows(self):
+        self.db.create_table("up_tbl", pd.DataFrame({"id": [1], "v": [1.0]}),
+                             unique_cols=["id"], auto_populate=False)
+        self.db.insert_dataframe("up_tbl", pd.DataFrame({"id": [1], "v": [1.0]}),
+                                 unique_cols=["id"])
+        self.db.insert_dataframe("up_tbl", pd.DataFrame({"id": [1, 2], "v": [9.0, 2.0]}),
+                                 unique_cols=["id"], update_on_conflict=False)
+        with self.db.engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, v FROM up_tbl ORDER BY id")).all()
+        self.assertEqual([tuple(r) for r in rows], [(1, 1.0), (2, 2.0)])
+
+    def test_transaction_batches_writes_on_one_connection(self):
+        self.db.create_table("up_tbl", pd.DataFrame({"id": [1]}),
+                             unique_cols=["id"], auto_populate=False)
+        with self.db.transaction() as conn:
+            self.db.insert_row("cached_tbl", {"id": 1}, conn=conn)
+            self.db.insert_dataframe("cached_tbl", pd.DataFrame({"id": [2]}),
+                                     conn=conn)
+            self.db.insert_dataframe("up_tbl", pd.DataFrame({"id": [1, 1]}),
+                                     unique_cols=["id"], conn=conn)
+        with self.assertRaises(RuntimeError), self.db.transaction() as conn:
+            self.db.insert_row("cached_tbl", {"id": 3}, conn=conn)
+            raise RuntimeError("abort batch")
+        with self.db.engine.connect() as conn:
+            self.assertEqual(conn.execute(
+                text("SELECT id FROM cached_tbl ORDER BY id")).scalars().all(), [1, 2])
+            self.assertEqual(conn.execute(
+                text("SELECT count(*) FROM up_tbl")).scalar(), 1)
+
+    def test_inserts_reflect_table_once(self):
+        with patch("data_pipeline.db_utils.Table", wraps=Table) as table:
+            self.db.insert_row("cached_tbl", {"id": 1})
+            self.db.insert_row("cached_tbl", {"id": 2})
+            self.db.insert_dataframe("cached_tbl", pd.DataFrame({"id": [3]}))
+        self.assertEqual(table.call_count, 1)
+
+    def test_empty_existing_table_triggers_population(self):
+        with patch.object(self.db, "_trigger_data_population") as populate:
+            self.db.create_table("cached_tbl", pd.DataFrame({"id": [1]}))
+            self.assertFalse(populate.called)  # only financial_tbl populates
+        with self.db.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE financial_tbl (id INTEGER)"))
+        with patch.object(self.db, "_trigger_data_population") as populate:
+            self.db.create_table("financial_tbl", pd.DataFrame({"id": [1]}))
+            populate.assert_called_once()
+            self.db.insert_row("financial_tbl", {"id": 1})
+            self.db.create_table("financial_tbl", pd.DataFrame({"id": [1]}))
+            populate.assert_called_once()
+
+    def test_postgresql_unique_index_built_concurrently(self):
+        self.db.engine = MagicMock(wraps=self.db.engine)
+        self.db.engine.dialect = postgresql.dialect()
+        self.db._idx_cache["cached_tbl"] = set()
+        conn = self.db.engine.connect.return_value.execution_options.return_value
+        conn = conn.__enter__.return_value
+        conn.execute.return_value.scalar.return_value = None  # no invalid index
+
+        self.db._ensure_unique_index("cached_tbl", ("id",))
+
+        self.db.engine.connect.return_value.execution_options.assert_called_with(
+            isolation_level="AUTOCOMMIT")
+        sqls = [c.args[0] for c in conn.exec_driver_sql.call_args_list]
+        self.assertEqual(sqls, [
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "uq_cached_tbl_id" '
+            'ON "cached_tbl" ("id")',
+            'ALTER TABLE "cached_tbl" ADD CONSTRAINT "uq_cached_tbl_id" '
+            'UNIQUE USING INDEX "uq_cached_tbl_id"',
+        ])
+
+    def _pg_index_conn(self, invalid):
+        self.db.engine = MagicMock(wraps=self.db.engine)
+        self.db.engine.dialect = postgresql.dialect()
+        self.db._idx_cache["cached_tbl"] = set()
+        conn = self.db.engine.connect.return_value.execution_options.return_value
+        conn = conn.__enter__.return_value
+        conn.execute.return_value.scalar.return_value = invalid
+        return conn
+
+    def test_invalid_index_is_dropped_before_rebuild(self):
+        conn = self._pg_index_conn(invalid=True)
+        conn.exec_driver_sql.side_effect = [
+            None, None, DBAPIError("ALTER", {}, Exception("55000"))]
+
+        self.db._ensure_unique_index("cached_tbl", ("id",))
+
+        sqls = [c.args[0] for c in conn.exec_driver_sql.call_args_list]
+        self.assertEqual(sqls[0], 'DROP INDEX CONCURRENTLY IF EXISTS "uq_cached_tbl_id"')
+        self.assertTrue(sqls[1].startswith("CREATE UNIQUE INDEX CONCURRENTLY"))
+
+    def test_failed_concurrent_build_drops_half_built_index(self):
+        conn = self._pg_index_conn(invalid=None)
+        conn.exec_driver_sql.side_effect = [
+            IntegrityError("CREATE", {}, Exception("duplicate key")), None]
+
+        with self.assertRaises(IntegrityError):
+            self.db._ensure_unique_index("cached_tbl", ("id",))
+
+        self.assertEqual(conn.exec_driver_sql.call_args_list[-1].args[0],
+                         'DROP INDEX CONCURRENTLY IF EXISTS "uq_cached_tbl_id"')
+
+    def test_probe_ignores_invalid_indexes(self):
+        self.assertIn("x.indisvalid", str(_PG_PROBE_SQL))
+
+    def test_created_table_is_cached_without_reflection(self):
+        with patch.object(self.db.inspector, "get_columns") as get_columns:
+            self.db.create_table("new_tbl", pd.DataFrame({"id": [1]}),
+                                 auto_populate=False)
+            tbl = self.db._table("new_tbl")
+        get_columns.assert_not_called()
+        self.assertIs(tbl.metadata, self.db.metadata)
+        self.assertIn("new_tbl", inspect(self.db.engine).get_table_names())
+
+    def test_invalidate_drops_cached_upsert_statements(self):
+        tbl = self.db._table("cached_tbl")
+        self.db._upsert_stmt(tbl, ("id",), ("id",))
+        self.db._invalidate_table("cached_tbl")
+        self.assertEqual(self.db._upsert_cache, {})
+
+    def test_postgresql_probe_replaces_inspector_round_trips(self):
+        self.db.engine = MagicMock(wraps=self.db.engine)
+        self.db.engine.dialect = postgresql.dialect()
+        conn = self.db.engine.connect.return_value.execution_options.return_value
+        conn = conn.__enter__.return_value
+        conn.execute.return_value.one.return_value = (
+            True, True, ["id", "x"], ["uq_cached_tbl_id"])
+
+        with patch.object(self.db.inspector, "has_table") as has_table, \
+                patch.object(self.db.inspector, "get_columns") as get_columns:
+            self.db.create_table("cached_tbl", pd.DataFrame({"id": [1], "x": [1.0]}),
+                                 auto_populate=False)
+        has_table.assert_not_called()
+        get_columns.assert_not_called()
+        conn.exec_driver_sql.assert_not_called()  # estimate says non-empty
+        self.db.engine.connect.assert_called_once()  # probe reuses the DDL connection
+        self.assertEqual(self.db._columns("cached_tbl"), {"id", "x"})
+        self.assertEqual(self.db._index_names("cached_tbl"), {"uq_cached_tbl_id"})
+
+    def test_close_releases_schema_caches(self):
+        self.db._table("cached_tbl")
+        self.db._columns("cached_tbl")
+        self.db.close()
+        self.assertEqual(self.db.metadata.tables, {})
+        self.assertEqual(self.db._table_cache, {})
+        self.assertEqual(self.db._col_cache, {})
+
+    def test_invalidate_forces_reflection(self):
+        first = self.db._table("cached_tbl")
+        self.db._invalidate_table("cached_tbl")
+        self.assertIsNot(self.db._table("cached_tbl"), first)
+
+
+class TestSafeChunksize(unittest.TestCase):
+    def test_chunksize_capped_by_bind_parameter_limit(self):
+        self.assertEqual(_safe_chunksize(900, 3), 900)
+        self.assertEqual(_safe_chunksize(900, 100), 327)
+        self.assertEqual(_safe_chunksize(900, 50000), 1)
+
+
+class TestCopyCsv(unittest.TestCase):
+    def test_nulls_are_distinct_from_empty_strings(self):
+        cur = MagicMock(spec=["execute"])
+        df = pd.DataFrame({"a": [1.5, None], "b": ["", None]})
+        _copy_csv(cur, "stg", '"a", "b"', df)
+        self.assertIn("NULL '\\N'", cur.execute.call_args.args[0])
+        self.assertEqual(
+            cur.execute.call_args.kwargs["stream"].getvalue(), "1.5,\n\\N,\\N\n")
+
+    def test_nan_in_integer_column_loads_as_null(self):
+        cur = MagicMock(spec=["execute"])
+        tbl = Table("t", MetaData(), Column("v", BigInteger), Column("f", Float))
+        df = pd.DataFrame({"v": [100, None], "f": [2.0, None]})
+        _copy_csv(cur, "stg", '"v", "f"', _coerce_int_columns(df, tbl))
+        self.assertEqual(
+            cur.execute.call_args.kwargs["stream"].getvalue(), "100,2.0\n\\N,\\N\n")
+
+    def test_psycopg2_cursor_uses_copy_expert(self):
+        cur = MagicMock(spec=["copy_expert"])
+        _copy_csv(cur, "stg", '"a"', pd.DataFrame({"a": [1]}))
+        cur.copy_expert.assert_called_once()
+
+
+class TestRecords(unittest.TestCase):
+    def test_missing_values_become_none(self):
+        df = pd.DataFrame(
+            {
+                "f": [1.5, float("nan")],
+                "s": ["x", None],
+                "t": pd.to_datetime(["2024-01-02", None]),
+                "n": pd.array([1, None], dtype="Int64"),
+                "i": [1, 2],
+            }
+        )
+        rows = _records(df)
+        self.assertEqual(rows[0], {"f": 1.5, "s": "x", "t": pd.Timestamp(
+            "2024-01-02"), "n": 1, "i": 1})
+        self.assertEqual(rows[1], {"f": None, "s": None, "t": None,
+                                   "n": None, "i": 2})
+        self.assertIs(type(rows[1]["i"]), int)
+        self.assertIs(type(rows[0]["t"]), datetime.datetime)
+
+    def test_numeric_only_frame_still_maps_nan_to_null(self):
+        df = pd.DataFrame({"pe": [float("nan"), 12.0], "n": [1, 2]})
+        rows = _records(df)
+        self.assertIsNone(rows[0]["pe"])
+        self.assertEqual(rows[1], {"pe": 12.0, "n": 2})
+
+
+class TestOwnedEngine(unittest.TestCase):
+    def test_server_url_uses_shared_pool_settings(self):
+        from data_pipeline.db_connection import POOL_SIZE
+
+        kwargs = _engine_kwargs("postgresql+pg8000://user:pw@localhost/db")
+        self.assertEqual(kwargs["pool_size"], POOL_SIZE)
+        self.assertTrue(kwargs["pool_pre_ping"])
+
+    def test_sqlite_url_has_no_pool_limits(self):
+        self.assertEqual(_engine_kwargs("sqlite://"), {"pool_pre_ping": True})
+
+    def test_psycopg2_engine_dialect_batches_executemany(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.dialects.postgresql.psycopg2 import \
+            EXECUTEMANY_VALUES_PLUS_BATCH
+
+        url = "postgresql+psycopg2://user:pw@localhost/db"
+        engine = create_engine(url, **_engine_kwargs(url))
+        self.addCleanup(engine.dispose)
+        self.assertEqual(engine.dialect.executemany_mode,
+                         EXECUTEMANY_VALUES_PLUS_BATCH)
+        self.assertTrue(engine.dialect.use_insertmanyvalues)
+
+    def test_psycopg2_url_enables_batched_executemany(self):
+        kwargs = _engine_kwargs("postgresql+psycopg2://user:pw@localhost/db")
+        self.assertEqual(kwargs["executemany_mode"], "values_plus_batch")
+        self.assertNotIn(
+            "executemany_mode",
+            _engine_kwargs("postgresql+pg8000://user:pw@localhost/db"))
+
+
+class TestSATypeForSeries(unittest.TestCase):
+    def test_integer_width_follows_dtype(self):
+        def name(values, dtype):
+            return type(_sa_type_for_series(pd.Series(values, dtype=dtype))).__name__
+
+        self.assertEqual(name([1], "int64"), "BigInteger")
+        self.assertEqual(name([1, None], "Int64"), "BigInteger")
+        self.assertEqual(name([1], "int32"), "Integer")
+        self.assertEqual(name([1], "uint32"), "Integer")
+        self.assertEqual(name([2**32 - 1], "uint32"), "BigInteger")
+
+    def test_non_integer_kinds(self):
+        def name(series, col_name=None):
+            return type(_sa_type_for_series(series, col_name)).__name__
+
+        self.assertEqual(name(pd.Series([True])), "Boolean")
+        self.assertEqual(name(pd.Series([1.5])), "Float")
+        self.assertEqual(name(pd.Series(pd.to_datetime(["2024-01-02"]))), "DateTime")
+        self.assertEqual(name(pd.Series(["x"])), "Text")
+        self.assertEqual(name(pd.Series([pd.Timedelta(1)])), "Text")
+        self.assertEqual(name(pd.Series(["2024-01-02"]), "Date"), "Date")
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from data_pipeline import factor_kernels as fk
+
+
+def _pandas_grouped_rolling(x, starts, window, min_periods, how="mean", ddof=1):
+    """Reference per-block rolling mean/std computed with pandas groupby."""
+    ids = np.repeat(np.arange(len(starts) - 1), np.diff(starts))
+    rolling = pd.Series(x).groupby(ids, sort=False).rolling(
+        window, min_periods=min_periods)
+    out = rolling.std(ddof=ddof) if how == "std" else rolling.mean()
+    return out.to_numpy(dtype=np.float64)
+
+
+def _ragged_prices(seed=0):
+    """Three tickers of different lengths with interior and leading NaNs."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for ticker, n in (("A.L", 300), ("B.L", 40), ("C.L", 5)):
+        px = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        px[rng.random(n) < 0.05] = np.nan
+        px[0] = np.nan
+        frames.append(pd.DataFrame({"Ticker": ticker, "close": px}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_group_starts_and_positions():
+    starts = fk.group_starts(np.array(["A", "A", "B", "C", "C", "C"]))
+    assert starts.tolist() == [0, 2, 3, 6]
+    assert fk.group_positions(starts).tolist() == [0, 1, 0, 0, 1, 2]
+
+
+def test_grouped_pct_change_matches_pandas():
+    df = _ragged_prices()
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    close_ff = fk.grouped_ffill(df["close"].to_numpy(), starts)
+    for lag in (1, 21, 63):
+        expected = df.groupby("Ticker")["close"].transform(
+            lambda s: s.ffill().pct_change(periods=lag))
+        got = fk.grouped_pct_change(close_ff, starts, lag)
+        np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-12, equal_nan=True)
+        from_logs = np.expm1(fk.grouped_lag_diff(np.log(close_ff), starts, lag))
+        np.testing.assert_allclose(from_logs, expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_pandas_reference_matches_per_ticker_transform():
+    df = _ragged_prices()
+    x = df["close"].to_numpy()
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    expected_mean = df.groupby("Ticker")["close"].transform(
+        lambda s: s.rolling(20, min_periods=20).mean())
+    expected_std = df.groupby("Ticker")["close"].transform(
+        lambda s: s.rolling(21, min_periods=7).std())
+    np.testing.assert_allclose(_pandas_grouped_rolling(x, starts, 20, 20),
+                               expected_mean.to_numpy(), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(_pandas_grouped_rolling(x, starts, 21, 7, how="std"),
+                               expected_std.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_rolling_kernels_match_pandas_rolling():
+    df = _ragged_prices(seed=1)
+    x = df["close"].pct_change(fill_method=None).to_numpy()
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    for window, min_periods in ((21, 7), (63, 21), (5, 5)):
+        mean, std = fk.rolling_mean_std_grouped(x, starts, window, min_periods)
+        np.testing.assert_allclose(
+            mean, _pandas_grouped_rolling(x, starts, window, min_periods),
+            rtol=1e-9, atol=1e-12, equal_nan=True)
+        np.testing.assert_allclose(
+            std, _pandas_grouped_rolling(x, starts, window, min_periods, how="std"),
+            rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.skipif(not fk.NUMBA_AVAILABLE, reason="numba not installed")
+def test_macd_kernel_matches_ta():
+    df = _ragged_prices(seed=2)
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    macd, hist = fk.macd_grouped(df["close"].to_numpy(), starts)
+    for ticker, group in df.groupby("Ticker"):
+        prices = group["close"].dropna()
+        rows = prices.index.to_numpy()
+        if len(prices) < 26:
+            assert np.isnan(macd[group.index]).all()
+            continue
+        ref = ta.trend.MACD(prices, window_slow=26, window_fast=12, window_sign=9)
+        np.testing.assert_allclose(macd[rows], ref.macd(), rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(hist[rows], ref.macd_diff(), rtol=1e-9, equal_nan=True)
+        # Rows with a missing close stay NaN
+        assert np.isnan(macd[group.index.difference(prices.index)]).all()
+
+
+def test_float32_input_returns_float64():
+    df = _ragged_prices(seed=3)
+    x = df["close"].to_numpy()
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    mean64, std64 = fk.rolling_mean_std_grouped(x, starts, 20, 20, ddof=0)
+    mean32, std32 = fk.rolling_mean_std_grouped(x.astype(np.float32), starts, 20, 20, ddof=0)
+    assert mean32.dtype == np.float64 and std32.dtype == np.float64
+    np.testing.assert_allclose(mean32, mean64, rtol=1e-6, equal_nan=True)
+    np.testing.assert_allclose(std32, std64, rtol=1e-4, equal_nan=True)
+
+
+@pytest.mark.parametrize("use_bottleneck", [False, True])
+def test_blockwise_fallback_matches_pandas(monkeypatch, use_bottleneck):
+    if use_bottleneck and not fk.BOTTLENECK_AVAILABLE:
+        pytest.skip("bottleneck not installed")
+    monkeypatch.setattr(fk, "BOTTLENECK_AVAILABLE", use_bottleneck)
+    df = _ragged_prices(seed=4)
+    x = df["close"].to_numpy()
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    for window, min_periods, ddof in ((20, 20, 0), (63, 21, 1), (252, 84, 1)):
+        mean, std = fk._rolling_moments_blockwise(x, starts, window, min_periods, ddof)
+        np.testing.assert_allclose(
+            mean, _pandas_grouped_rolling(x, starts, window, min_periods),
+            rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(
+            std, _pandas_grouped_rolling(x, starts, window, min_periods, how="std", ddof=ddof),
+            rtol=1e-9, equal_nan=True)
+
+
+def test_grouped_sma_matches_pandas():
+    df = _ragged_prices(seed=5)
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    sma = fk.grouped_sma(df["close"].to_numpy(), starts, [3, 20, 200])
+    for window, got in sma.items():
+        expected = df.groupby("Ticker")["close"].transform(
+            lambda s: s.rolling(window, min_periods=window).mean())
+        np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.skipif(not fk.NUMBA_AVAILABLE, reason="numba not installed")
+def test_rsi_kernel_matches_ta():
+    df = _ragged_prices(seed=6)
+    starts = fk.group_starts(df["Ticker"].to_numpy())
+    expected = df.groupby("Ticker")["close"].transform(
+        lambda s: ta.momentum.rsi(s, window=14))
+    np.testing.assert_allclose(fk.rsi_grouped(df["close"].to_numpy(), starts, 14),
+                               expected.to_numpy(), rtol=1e-9, equal_nan=True)
@@ -0,0 +1,20 @@
+import pytest
+
+from data_pipeline import utils
+
+
+def test_get_secrets_bulk_prefers_environment(monkeypatch):
+    monkeypatch.setenv("SECRET_A", "a")
+    monkeypatch.setenv("SECRET_B", "b")
+
+    assert utils.get_secrets_bulk(["SECRET_A", "SECRET_B", "SECRET_A"]) == {
+        "SECRET_A": "a", "SECRET_B": "b"}
+
+
+def test_get_secrets_bulk_raises_for_missing_secret(monkeypatch):
+    monkeypatch.setenv("SECRET_A", "a")
+    monkeypatch.delenv("SECRET_MISSING", raising=False)
+    monkeypatch.setattr(utils.config, "USE_GCP_SECRET_MANAGER", False)
+
+    with pytest.raises(RuntimeError):
+        utils.get_secrets_bulk(["SECRET_A", "SECRET_MISSING"])
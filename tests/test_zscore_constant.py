@@ -3,7 +3,7 @@ import unittest
 import numpy as np
 import pandas as pd
 
-from data_pipeline.compute_factors import compute_factors
+from data_pipeline.compute_factors import _zscore_by, compute_factors
 
 
 class TestZScoreConstant(unittest.TestCase):
@@ -27,6 +27,20 @@ class TestZScoreConstant(unittest.TestCase):
         self.assertTrue(np.all(result["norm_quality_score"].fillna(0) == 0))
         self.assertTrue(np.all(result["z_earnings_yield"].fillna(0) == 0))
 
+    def test_zscore_by_date(self):
+        df = pd.DataFrame(
+            {
+                "Date": ["d1", "d1", "d1", "d2", "d2", "d3"],
+                "x": [1.0, 2.0, 3.0, 0.1, 0.1, 5.0],
+            }
+        )
+
+        z = _zscore_by(df, "x")
+
+        np.testing.assert_allclose(z[:3], [-1.0, 0.0, 1.0])
+        # Constant and single-member dates fall back to zero
+        self.assertTrue(np.all(z[3:] == 0))
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
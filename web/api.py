@@ -15,12 +15,20 @@ from sqlalchemy.exc import OperationalError, TimeoutError as SQLTimeoutError, Da
 from pg8000.exceptions import InterfaceError
 
 from data_pipeline.compute_factors import compute_factors
-from data_pipeline.db_connection import engine, get_db
+from data_pipeline.db_connection import get_db, get_engine
 from data_pipeline.utils import get_secret
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+
+def __getattr__(name):
+    # ``web.api.engine`` resolves to the lazily created shared engine
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 app = FastAPI()
 
 # In-memory cache for API responses
@@ -138,7 +146,7 @@ def execute_query_with_retry(query: text, params: dict = None, max_retries: int
             logger.debug(f"Executing query attempt {attempt + 1}/{max_retries}")
             
             # Use the global engine with connection from pool
-            with engine.connect() as conn:
+            with get_engine().connect() as conn:
                 # Set query timeout
                 conn = conn.execution_options(autocommit=True)
                 df = pd.read_sql(query, conn, params=params or {})
@@ -181,7 +189,7 @@ def health() -> dict:
     """Enhanced health check endpoint with database connectivity test."""
     try:
         # Test database connectivity
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             conn.execute(text("SELECT 1"))
         return {"status": "ok", "database": "connected"}
     except Exception as e: